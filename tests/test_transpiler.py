@@ -1,14 +1,19 @@
 """TOUGH コンパイラのテスト"""
 
+import io
 import sys
 import os
 
+import pytest
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from tough.lexer import Lexer, LexerError
 from tough.parser import Parser, ParseError
 from tough.codegen import CodeGenerator, CodeGenError
+from tough.cache import BoundedCache, hash_source
 from tough.compiler import Compiler
+from tough.transpiler import ToughTranspiler, ToughTranspileError, ToughRunner, run_tough
 from tough.tokens import TokenType
 from tough.ast_nodes import (
     DeclareStatement, AssignStatement, PrintStatement,
@@ -60,6 +65,38 @@ class TestLexer:
         tokens = lexer.tokenize()
         assert tokens[0].type == TokenType.IF
 
+    def test_unclosed_string_raises_lexer_error(self):
+        with pytest.raises(LexerError) as exc_info:
+            Lexer("「hello しゃあっ").tokenize()
+        assert exc_info.value.line == 1
+
+    def test_all_lexer_errors_reported_together(self):
+        with pytest.raises(LexerError) as exc_info:
+            Lexer("@@@ しゃあっ\n1 しゃあっ\n「abc しゃあっ").tokenize()
+        assert exc_info.value.line == 1
+        assert [err.line for err in exc_info.value.errors] == [1, 3]
+        assert "行 3" in str(exc_info.value)
+
+    def test_comparison_keywords_longest_match(self):
+        lexer = Lexer("なにっ (x ガチンコじゃない 0 ガチンコ y) {")
+        types = [t.type for t in lexer.tokenize()]
+        assert types[2:7] == [
+            TokenType.IDENT, TokenType.NEQ, TokenType.INT, TokenType.EQ, TokenType.IDENT,
+        ]
+
+    def test_number_literals_carry_value(self):
+        tokens = Lexer("-12 を継ぐ x\n3.5 しゃあっ").tokenize()
+        assert tokens[0].type == TokenType.INT
+        assert tokens[0].num == -12
+        float_tok = next(t for t in tokens if t.type == TokenType.FLOAT)
+        assert float_tok.num == 3.5
+
+    def test_identifier_names_are_interned(self):
+        tokens = Lexer("count しゃあっ\ncount 進化したと言うてくれや").tokenize()
+        idents = [t.value for t in tokens if t.type == TokenType.IDENT]
+        assert len(idents) == 2
+        assert idents[0] is idents[1]
+
 
 class TestParser:
     """構文解析のテスト"""
@@ -115,6 +152,24 @@ x 進化したと言うてくれや
         assert isinstance(prog.statements[0], WhileStatement)
 
 
+@pytest.fixture
+def no_jit(monkeypatch):
+    """JIT が初期化されたら失敗させる"""
+    def fail(cls):
+        raise AssertionError("JIT が初期化された")
+
+    monkeypatch.setattr(Compiler, "_get_target_machine", classmethod(fail))
+
+
+def _loop_program(n: int) -> str:
+    """ループを含むので JIT 経由で実行されるプログラム（n ごとに別のソースになる）"""
+    return f"""kだ kが正体を現すぞ
+0 を継ぐ k
+禁断の"k に及ばない {n} 度打ち" {{
+k 進化したと言うてくれや
+}}"""
+
+
 class TestCodeGen:
     """コード生成のテスト（LLVM IR が生成されることを確認）"""
 
@@ -127,6 +182,7 @@ class TestCodeGen:
         assert "define" in ir_text
         assert "main" in ir_text
         assert "printf" in ir_text
+        assert 'call i32 @"puts"' in ir_text
 
     def test_variable_generates_ir(self):
         source = """xだ xが正体を現すぞ
@@ -154,3 +210,229 @@ x 進化したと言うてくれや
         ir_text = self._gen_ir(source)
         assert "while.cond" in ir_text
         assert "while.body" in ir_text
+
+    def test_emit_ir_does_not_init_jit(self, no_jit):
+        compiler = Compiler()
+        assert "define" in compiler.emit_ir("「Hello」 しゃあっ")
+
+    def test_format_strings_are_shared(self):
+        source = """「a」 しゃあっ
+「a」 しゃあっ
+1 しゃあっ
+2 しゃあっ"""
+        ir_text = self._gen_ir(source)
+        # "a", "%lld\n" の 2 つだけが生成される
+        assert ir_text.count("internal constant") == 2
+        # 文字列ポインタは定数式の GEP で、命令としては出力されない
+        assert "= getelementptr" not in ir_text
+
+    def test_statements_after_end_are_dropped(self):
+        source = """逃げるんかいっ
+「unreachable」 しゃあっ"""
+        ir_text = self._gen_ir(source)
+        assert "unreachable" not in ir_text
+        assert ir_text.count("ret i32") == 1
+
+    def test_function_has_internal_linkage(self):
+        source = """自分たちの手で作るから尊いんだ fが (a)るんだ {
+a しゃあっ
+}"""
+        ir_text = self._gen_ir(source)
+        assert 'define internal i64 @"f"' in ir_text
+
+    def test_literal_comparison_is_folded(self):
+        ir_text = self._gen_ir("""なにっ (-7 % 3 ガチンコ -1) {
+「yes」 しゃあっ
+}""")
+        # 条件式全体が定数 1 に畳み込まれ、if の判定だけが残る
+        assert "srem" not in ir_text
+        assert "icmp eq" not in ir_text
+        assert "icmp ne i64 1, 0" in ir_text
+
+    def test_out_of_range_literal_is_folded_as_int64(self):
+        # 2^63 は i64 では -2^63 になるので、0 を超えないし -2^63 と等しい
+        ir_text = self._gen_ir("""なにっ (9223372036854775808 を超えた 0) {
+「gt」 しゃあっ
+}""")
+        assert "icmp ne i64 0, 0" in ir_text
+        ir_text = self._gen_ir("9223372036854775808 ガチンコ -9223372036854775808 しゃあっ")
+        assert "i64 1)" in ir_text
+
+    def test_unknown_statement_raises(self):
+        from tough.ast_nodes import Statement, Program
+
+        codegen = CodeGenerator()
+        with pytest.raises(CodeGenError) as exc_info:
+            codegen.generate(Program(statements=[Statement(line=3)]))
+        assert exc_info.value.line == 3
+
+
+class TestCompiler:
+    """JIT 実行パイプラインのテスト"""
+
+    def test_run_reuses_cached_engine(self):
+        from tough import compiler as compiler_mod
+
+        source = _loop_program(3)
+        compiler = Compiler()
+        assert compiler.run(source) == 0
+        key = (hash_source(source), compiler.opt_level)
+        cached = compiler_mod._ENGINE_CACHE[key]
+        assert compiler.run(source) == 0
+        assert compiler_mod._ENGINE_CACHE[key] is cached
+
+    def test_evicted_engine_is_closed(self, monkeypatch):
+        from tough import compiler as compiler_mod
+
+        monkeypatch.setattr(compiler_mod._ENGINE_CACHE, "maxsize", 1)
+        compiler = Compiler()
+        assert compiler.run(_loop_program(7)) == 0
+        first_key = (hash_source(_loop_program(7)), compiler.opt_level)
+        first_engine = compiler_mod._ENGINE_CACHE[first_key][0]
+        assert compiler.run(_loop_program(8)) == 0
+        assert first_key not in compiler_mod._ENGINE_CACHE
+        assert first_engine.closed
+
+        # 破棄したエンジンは作り直して実行できる
+        assert compiler.run(_loop_program(7)) == 0
+
+    @pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="/proc/self/statm が必要")
+    def test_evicted_engines_release_memory(self, monkeypatch):
+        from tough import compiler as compiler_mod
+
+        def rss():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+        monkeypatch.setattr(compiler_mod._ENGINE_CACHE, "maxsize", 2)
+        compiler = Compiler()
+        for n in range(1000, 1050):
+            assert compiler.run(_loop_program(n)) == 0
+        before = rss()
+        # 共有エンジンから remove_module するだけだと 1 プログラムあたり 10 KB 以上増え続けた
+        for n in range(1050, 1650):
+            assert compiler.run(_loop_program(n)) == 0
+        assert rss() - before < 3 * 1024 * 1024
+
+    def test_short_source_skips_optimization(self, monkeypatch):
+        optimized = []
+        monkeypatch.setattr(Compiler, "_optimize", lambda self, mod, tm: optimized.append(mod))
+        source = _loop_program(2)
+        compiler = Compiler()
+        assert compiler.run(source) == 0
+        assert optimized == []
+
+        long_source = "（祠部矢のコメント）" + "長" * Compiler.OPTIMIZE_MIN_SOURCE_LEN + "\n" + source
+        assert compiler.run(long_source) == 0
+        assert len(optimized) == 1
+
+    def test_small_program_runs_without_jit(self, capsys, no_jit):
+        source = """xだ xが正体を現すぞ
+-7 を継ぐ x
+なにっ (x % 3 ガチンコ -1) {
+「yes」 しゃあっ
+}
+x 進化したと言うてくれや
+x しゃあっ"""
+        compiler = Compiler()
+        assert compiler.run(source) == 0
+        assert capsys.readouterr().out == "yes\n-6\n"
+
+    def test_small_program_wraps_int64(self, capsys, no_jit):
+        source = """9223372036854775807 を継ぐ x
+x 進化したと言うてくれや
+x しゃあっ"""
+        assert Compiler().run(source) == 0
+        assert capsys.readouterr().out == "-9223372036854775808\n"
+
+    def test_small_program_prints_utf8(self, monkeypatch, no_jit):
+        # 端末が cp932 でも JIT 版と同じく UTF-8 のバイト列を出力する
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="cp932")
+        monkeypatch.setattr(sys, "stdout", stdout)
+        assert Compiler().run("「勝ったッ😀」 しゃあっ\n-6 しゃあっ") == 0
+        assert stdout.buffer.getvalue() == "勝ったッ😀\n-6\n".encode("utf-8")
+
+    def test_run_tree_walk_runs_loops(self, capsys, no_jit):
+        source = """xだ xが正体を現すぞ
+0 を継ぐ x
+禁断の"x に及ばない 3 度打ち" {
+x しゃあっ
+x 進化したと言うてくれや
+}"""
+        assert Compiler().run_tree_walk(source) == 0
+        assert capsys.readouterr().out == "0\n1\n2\n"
+
+    def test_run_tree_walk_falls_back_to_jit(self, capsys, monkeypatch):
+        jitted = []
+        monkeypatch.setattr(Compiler, "run", lambda self, source: jitted.append(source) or 0)
+        source = """自分たちの手で作るから尊いんだ fが (a)るんだ {
+a しゃあっ
+}
+「after」 しゃあっ"""
+        assert Compiler().run_tree_walk(source) == 0
+        assert jitted == [source]
+        assert capsys.readouterr().out == ""
+
+    def test_undefined_variable_reported_before_output(self, capsys):
+        with pytest.raises(CodeGenError) as exc_info:
+            Compiler().run("「a」 しゃあっ\nx しゃあっ")
+        assert exc_info.value.line == 2
+        assert capsys.readouterr().out == ""
+
+
+class TestTranspiler:
+    """Python トランスパイラのテスト"""
+
+    def test_transpile_block(self):
+        source = """我が名は　尊鷹
+xだ xが正体を現すぞ
+1 を継ぐ x
+なにっ (x ガチンコ 1) {
+「one」 しゃあっ
+}
+逃げるんかいっ"""
+        assert ToughTranspiler().transpile(source) == "\n".join([
+            "import sys",
+            "x = None",
+            "x = 1",
+            "if x == 1:",
+            '    print("one")',
+            "sys.exit(0)",
+        ])
+
+    def test_unknown_line_raises(self):
+        with pytest.raises(ToughTranspileError) as exc_info:
+            ToughTranspiler().transpile("1 しゃあっ\n@@@")
+        assert exc_info.value.line_number == 2
+
+    def test_run_tough_reuses_transpiled_code(self, capsys, monkeypatch):
+        source = "「cached」 しゃあっ"
+        run_tough(source)
+
+        def fail(self, source):
+            raise AssertionError("再変換された")
+
+        monkeypatch.setattr(ToughTranspiler, "transpile", fail)
+        run_tough(source)
+        assert capsys.readouterr().out == "cached\ncached\n"
+
+    def test_runner_keeps_variables_between_runs(self, capsys):
+        runner = ToughRunner()
+        runner.run("41 を継ぐ x")
+        runner.run("x 進化したと言うてくれや\nx しゃあっ")
+        assert capsys.readouterr().out == "42\n"
+
+
+class TestCache:
+    """キャッシュのテスト"""
+
+    def test_bounded_cache_evicts_least_recently_used(self):
+        evicted = []
+        cache = BoundedCache(2, on_evict=lambda key, value: evicted.append((key, value)))
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1  # a を最近使ったものにする
+        cache["c"] = 3
+        assert evicted == [("b", 2)]
+        assert "b" not in cache
+        assert len(cache) == 2
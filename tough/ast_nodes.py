@@ -10,19 +10,19 @@ from dataclasses import dataclass, field
 # 基底クラス
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
     """AST ノードの基底クラス"""
     line: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression(ASTNode):
     """式の基底クラス"""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Statement(ASTNode):
     """文の基底クラス"""
     pass
@@ -32,25 +32,25 @@ class Statement(ASTNode):
 # リテラル・識別子
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class IntLiteral(Expression):
     """整数リテラル"""
     value: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class FloatLiteral(Expression):
     """浮動小数点リテラル"""
     value: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class StringLiteral(Expression):
     """文字列リテラル"""
     value: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Identifier(Expression):
     """識別子（変数参照）"""
     name: str = ""
@@ -60,7 +60,7 @@ class Identifier(Expression):
 # 演算
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(Expression):
     """二項演算（比較演算子・剰余）"""
     op: str = ""          # "==", "!=", ">", "<", "%"
@@ -72,68 +72,68 @@ class BinaryOp(Expression):
 # 文（Statement）
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class Program(ASTNode):
     """プログラム全体"""
     statements: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgramStart(Statement):
     """プログラム開始: 我が名は　尊鷹"""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgramEnd(Statement):
     """プログラム終了: 逃げるんかいっ"""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Comment(Statement):
     """コメント"""
     text: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class DeclareStatement(Statement):
     """変数宣言: Xだ Xが正体を現すぞ"""
     name: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class AssignStatement(Statement):
     """代入: (値) を継ぐ (変数)"""
     name: str = ""
     value: Expression = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PrintStatement(Statement):
     """出力: (値) しゃあっ"""
     value: Expression = None
 
 
-@dataclass
+@dataclass(slots=True)
 class InputStatement(Statement):
     """入力: (変数) を教えてくれよ"""
     name: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class IncrementStatement(Statement):
     """インクリメント: (変数) 進化したと言うてくれや"""
     name: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class DecrementStatement(Statement):
     """デクリメント: (変数) （哀）"""
     name: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     """条件分岐: なにっ / いやちょっとまてよ / う　あ　あ　あ　あ"""
     condition: Expression = None
@@ -142,14 +142,14 @@ class IfStatement(Statement):
     else_body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class WhileStatement(Statement):
     """ループ: 禁断の"...度打ち" """
     condition: Expression = None
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FnStatement(Statement):
     """関数定義"""
     name: str = ""
@@ -157,7 +157,7 @@ class FnStatement(Statement):
     body: list[Statement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ThrowStatement(Statement):
     """例外送出"""
     pass
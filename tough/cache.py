@@ -0,0 +1,51 @@
+"""TOUGH 言語 - キャッシュ
+
+コンパイラとトランスパイラで共有する、ソースのハッシュと件数上限付きのキャッシュ。
+"""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+def hash_source(source: str) -> bytes:
+    """キャッシュ用にソースコードのハッシュを計算する"""
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+
+class BoundedCache:
+    """最近使ったものから maxsize 件だけ残すキャッシュ（LRU）
+
+    あふれたエントリは on_evict(キー, 値) を呼んでから捨てる。
+    """
+
+    def __init__(self, maxsize: int, on_evict: Callable[[Hashable, object], None] | None = None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._entries: OrderedDict[Hashable, object] = OrderedDict()
+
+    def get(self, key: Hashable, default: object = None) -> object:
+        """値を取得する（取得したエントリは最近使ったものとして扱う）"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def __getitem__(self, key: Hashable) -> object:
+        return self._entries[key]
+
+    def __setitem__(self, key: Hashable, value: object) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            old_key, old_value = self._entries.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -22,6 +22,15 @@ class CodeGenError(Exception):
         super().__init__(f"行 {line}: {message}")
 
 
+_INT64_MIN = -(1 << 63)
+_UINT64_RANGE = 1 << 64
+
+
+def wrap_int64(value: int) -> int:
+    """LLVM の i64 と同じく、符号付き 64 ビットに丸める（桁あふれは折り返す）"""
+    return ((value - _INT64_MIN) % _UINT64_RANGE) + _INT64_MIN
+
+
 class CodeGenerator:
     """LLVM IR コード生成器"""
 
@@ -37,6 +46,12 @@ class CodeGenerator:
         self.char_ptr_type = self.char_type.as_pointer()
         self.void_type = ir.VoidType()
 
+        # よく使う定数（毎回生成しない）
+        self._i64_zero = ir.Constant(self.int_type, 0)
+        self._i64_one = ir.Constant(self.int_type, 1)
+        self._i32_zero = ir.Constant(self.int32_type, 0)
+        self._i32_one = ir.Constant(self.int32_type, 1)
+
         # 外部関数の宣言
         self._declare_externals()
 
@@ -45,6 +60,33 @@ class CodeGenerator:
         self.variables: dict[str, ir.AllocaInstr] = {}
         self.functions: dict[str, ir.Function] = {}
         self._string_counter = 0
+        self._bb_counter = 0
+        self._string_intern: dict[str, ir.GlobalVariable] = {}
+        self._string_ptrs: dict[str, ir.Value] = {}
+
+        # AST ノード型 → コード生成メソッド
+        self._stmt_dispatch = {
+            Comment: self._gen_nothing,
+            ProgramStart: self._gen_nothing,
+            ProgramEnd: self._gen_program_end,
+            DeclareStatement: self._gen_declare,
+            AssignStatement: self._gen_assign,
+            PrintStatement: self._gen_print,
+            InputStatement: self._gen_input,
+            IncrementStatement: self._gen_increment,
+            DecrementStatement: self._gen_decrement,
+            IfStatement: self._gen_if,
+            WhileStatement: self._gen_while,
+            FnStatement: self._gen_function,
+            ThrowStatement: self._gen_throw,
+        }
+        self._expr_dispatch = {
+            IntLiteral: self._gen_int_literal,
+            FloatLiteral: self._gen_float_literal,
+            Identifier: self._gen_identifier,
+            BinaryOp: self._gen_binary_op,
+            StringLiteral: self._gen_string_literal,
+        }
 
     def _declare_externals(self) -> None:
         """C ランタイムの外部関数を宣言する"""
@@ -52,6 +94,10 @@ class CodeGenerator:
         printf_type = ir.FunctionType(self.int32_type, [self.char_ptr_type], var_arg=True)
         self.printf = ir.Function(self.module, printf_type, name="printf")
 
+        # puts（文字列リテラルの出力用）
+        puts_type = ir.FunctionType(self.int32_type, [self.char_ptr_type])
+        self.puts = ir.Function(self.module, puts_type, name="puts")
+
         # scanf
         scanf_type = ir.FunctionType(self.int32_type, [self.char_ptr_type], var_arg=True)
         self.scanf = ir.Function(self.module, scanf_type, name="scanf")
@@ -61,7 +107,11 @@ class CodeGenerator:
         self.exit_func = ir.Function(self.module, exit_type, name="exit")
 
     def _create_global_string(self, value: str) -> ir.GlobalVariable:
-        """グローバル文字列定数を作成する"""
+        """グローバル文字列定数を作成する（同じ内容の文字列は使い回す）"""
+        cached = self._string_intern.get(value)
+        if cached is not None:
+            return cached
+
         self._string_counter += 1
         encoded = bytearray(value.encode("utf-8")) + bytearray(b"\x00")
         str_type = ir.ArrayType(self.char_type, len(encoded))
@@ -69,12 +119,25 @@ class CodeGenerator:
         str_var.global_constant = True
         str_var.linkage = "internal"
         str_var.initializer = ir.Constant(str_type, encoded)
+        self._string_intern[value] = str_var
         return str_var
 
     def _get_string_ptr(self, global_str: ir.GlobalVariable) -> ir.Value:
-        """グローバル文字列のポインタを取得する"""
-        zero = ir.Constant(self.int_type, 0)
-        return self.builder.gep(global_str, [zero, zero], inbounds=True)
+        """グローバル文字列のポインタを取得する
+
+        命令ではなく定数式の GEP なので、どの関数・ブロックからでも使い回せる。
+        """
+        ptr = self._string_ptrs.get(global_str.name)
+        if ptr is None:
+            zero = self._i64_zero
+            ptr = global_str.gep([zero, zero])
+            self._string_ptrs[global_str.name] = ptr
+        return ptr
+
+    def _fresh_bb(self, prefix: str) -> str:
+        """重複しない基本ブロック名を作る（llvmlite の名前の重複解決を避ける）"""
+        self._bb_counter += 1
+        return f"{prefix}.{self._bb_counter}"
 
     def generate(self, program: Program) -> ir.Module:
         """Program AST から LLVM IR を生成する"""
@@ -87,96 +150,64 @@ class CodeGenerator:
         self.builder = ir.IRBuilder(block)
 
         # 全文をコード生成
-        for stmt in program.statements:
-            self._gen_statement(stmt)
+        self._gen_block(program.statements)
 
         # return 0 (もし最後のブロックが終端されていなければ)
         if not self.builder.block.is_terminated:
-            self.builder.ret(ir.Constant(self.int32_type, 0))
+            self.builder.ret(self._i32_zero)
 
         return self.module
 
-    def _gen_statement(self, stmt: Statement) -> None:
-        """文のコード生成"""
-        if isinstance(stmt, Comment):
-            return  # コメントは IR に含めない
-
-        if isinstance(stmt, ProgramStart):
-            return  # 特に何もしない（main 関数は既に開始済み）
-
-        if isinstance(stmt, ProgramEnd):
-            self.builder.call(self.exit_func, [ir.Constant(self.int32_type, 0)])
-            self.builder.ret(ir.Constant(self.int32_type, 0))
-            return
-
-        if isinstance(stmt, DeclareStatement):
-            self._gen_declare(stmt)
-            return
-
-        if isinstance(stmt, AssignStatement):
-            self._gen_assign(stmt)
-            return
-
-        if isinstance(stmt, PrintStatement):
-            self._gen_print(stmt)
-            return
-
-        if isinstance(stmt, InputStatement):
-            self._gen_input(stmt)
-            return
-
-        if isinstance(stmt, IncrementStatement):
-            self._gen_increment(stmt)
-            return
-
-        if isinstance(stmt, DecrementStatement):
-            self._gen_decrement(stmt)
-            return
-
-        if isinstance(stmt, IfStatement):
-            self._gen_if(stmt)
-            return
-
-        if isinstance(stmt, WhileStatement):
-            self._gen_while(stmt)
-            return
-
-        if isinstance(stmt, FnStatement):
-            self._gen_function(stmt)
-            return
-
-        if isinstance(stmt, ThrowStatement):
-            # exit(1) で代用
-            self.builder.call(self.exit_func, [ir.Constant(self.int32_type, 1)])
-            self.builder.ret(ir.Constant(self.int32_type, 1))
-            return
-
-        raise CodeGenError(f"未対応の文: {type(stmt).__name__}", stmt.line)
+    def _gen_block(self, stmts: list[Statement]) -> None:
+        """文リストのコード生成（ディスパッチ表を直接引く）"""
+        dispatch = self._stmt_dispatch
+        for stmt in stmts:
+            # 終端済みブロックの後ろは到達不能なので IR を生成しない（関数定義は別関数なので生成する）
+            if self.builder.block.is_terminated and type(stmt) is not FnStatement:
+                continue
+            handler = dispatch.get(type(stmt))
+            if handler is None:
+                raise CodeGenError(f"未対応の文: {type(stmt).__name__}", stmt.line)
+            handler(stmt)
+
+    def _gen_nothing(self, stmt: Statement) -> None:
+        """IR を生成しない文（コメント・プログラム開始）"""
+        # コメントは IR に含めない / main 関数は既に開始済み
+        return
+
+    def _gen_program_end(self, stmt: ProgramEnd) -> None:
+        """プログラム終了: exit(0)"""
+        self.builder.call(self.exit_func, [self._i32_zero])
+        self.builder.ret(self._i32_zero)
+
+    def _gen_throw(self, stmt: ThrowStatement) -> None:
+        """例外送出: exit(1) で代用"""
+        self.builder.call(self.exit_func, [self._i32_one])
+        self.builder.ret(self._i32_one)
 
     def _gen_declare(self, stmt: DeclareStatement) -> None:
         """変数宣言: alloca で領域を確保し 0 で初期化"""
         alloca = self.builder.alloca(self.int_type, name=stmt.name)
-        self.builder.store(ir.Constant(self.int_type, 0), alloca)
+        self.builder.store(self._i64_zero, alloca)
         self.variables[stmt.name] = alloca
 
     def _gen_assign(self, stmt: AssignStatement) -> None:
         """代入"""
         value = self._gen_expression(stmt.value)
-        if stmt.name not in self.variables:
+        alloca = self.variables.get(stmt.name)
+        if alloca is None:
             alloca = self.builder.alloca(self.int_type, name=stmt.name)
             self.variables[stmt.name] = alloca
-        self.builder.store(value, self.variables[stmt.name])
+        self.builder.store(value, alloca)
 
     def _gen_print(self, stmt: PrintStatement) -> None:
         """出力"""
         value = stmt.value
         if isinstance(value, StringLiteral):
-            # 文字列の場合: printf("%s\n", str)
-            fmt = self._create_global_string("%s\n")
-            fmt_ptr = self._get_string_ptr(fmt)
+            # 文字列の場合: puts(str)（改行も puts が出力する）
             str_val = self._create_global_string(value.value)
             str_ptr = self._get_string_ptr(str_val)
-            self.builder.call(self.printf, [fmt_ptr, str_ptr])
+            self.builder.call(self.puts, [str_ptr])
         else:
             # 数値の場合: printf("%lld\n", val)
             val = self._gen_expression(value)
@@ -186,60 +217,62 @@ class CodeGenerator:
 
     def _gen_input(self, stmt: InputStatement) -> None:
         """入力: scanf で整数を読み込む"""
-        if stmt.name not in self.variables:
+        alloca = self.variables.get(stmt.name)
+        if alloca is None:
             alloca = self.builder.alloca(self.int_type, name=stmt.name)
             self.variables[stmt.name] = alloca
         fmt = self._create_global_string("%lld")
         fmt_ptr = self._get_string_ptr(fmt)
-        self.builder.call(self.scanf, [fmt_ptr, self.variables[stmt.name]])
+        self.builder.call(self.scanf, [fmt_ptr, alloca])
 
     def _gen_increment(self, stmt: IncrementStatement) -> None:
         """インクリメント"""
-        if stmt.name not in self.variables:
+        alloca = self.variables.get(stmt.name)
+        if alloca is None:
             raise CodeGenError(f"未定義の変数: {stmt.name}", stmt.line)
-        current = self.builder.load(self.variables[stmt.name])
-        new_val = self.builder.add(current, ir.Constant(self.int_type, 1))
-        self.builder.store(new_val, self.variables[stmt.name])
+        current = self.builder.load(alloca)
+        new_val = self.builder.add(current, self._i64_one)
+        self.builder.store(new_val, alloca)
 
     def _gen_decrement(self, stmt: DecrementStatement) -> None:
         """デクリメント"""
-        if stmt.name not in self.variables:
+        alloca = self.variables.get(stmt.name)
+        if alloca is None:
             raise CodeGenError(f"未定義の変数: {stmt.name}", stmt.line)
-        current = self.builder.load(self.variables[stmt.name])
-        new_val = self.builder.sub(current, ir.Constant(self.int_type, 1))
-        self.builder.store(new_val, self.variables[stmt.name])
+        current = self.builder.load(alloca)
+        new_val = self.builder.sub(current, self._i64_one)
+        self.builder.store(new_val, alloca)
 
     def _gen_if(self, stmt: IfStatement) -> None:
         """条件分岐"""
         func = self.builder.function
 
         # 基本ブロック
-        then_bb = func.append_basic_block("if.then")
-        merge_bb = func.append_basic_block("if.merge")
+        then_bb = func.append_basic_block(self._fresh_bb("if.then"))
+        merge_bb = func.append_basic_block(self._fresh_bb("if.merge"))
 
         # elif / else ブロックを先に作成
         elif_bbs = []
-        for i, (cond, body) in enumerate(stmt.elif_clauses):
-            elif_cond_bb = func.append_basic_block(f"elif.cond.{i}")
-            elif_body_bb = func.append_basic_block(f"elif.body.{i}")
+        for cond, body in stmt.elif_clauses:
+            elif_cond_bb = func.append_basic_block(self._fresh_bb("elif.cond"))
+            elif_body_bb = func.append_basic_block(self._fresh_bb("elif.body"))
             elif_bbs.append((elif_cond_bb, elif_body_bb, cond, body))
 
         else_bb = None
         if stmt.else_body:
-            else_bb = func.append_basic_block("if.else")
+            else_bb = func.append_basic_block(self._fresh_bb("if.else"))
 
         # 最初の分岐先（elif がなければ else、else もなければ merge）
         first_false_target = elif_bbs[0][0] if elif_bbs else (else_bb if else_bb else merge_bb)
 
         # if 条件評価
         cond_val = self._gen_expression(stmt.condition)
-        cond_bool = self.builder.icmp_signed("!=", cond_val, ir.Constant(self.int_type, 0))
+        cond_bool = self.builder.icmp_signed("!=", cond_val, self._i64_zero)
         self.builder.cbranch(cond_bool, then_bb, first_false_target)
 
         # then ブロック
         self.builder.position_at_start(then_bb)
-        for s in stmt.then_body:
-            self._gen_statement(s)
+        self._gen_block(stmt.then_body)
         if not self.builder.block.is_terminated:
             self.builder.branch(merge_bb)
 
@@ -249,20 +282,18 @@ class CodeGenerator:
 
             self.builder.position_at_start(cond_bb)
             elif_cond_val = self._gen_expression(cond)
-            elif_cond_bool = self.builder.icmp_signed("!=", elif_cond_val, ir.Constant(self.int_type, 0))
+            elif_cond_bool = self.builder.icmp_signed("!=", elif_cond_val, self._i64_zero)
             self.builder.cbranch(elif_cond_bool, body_bb, next_target)
 
             self.builder.position_at_start(body_bb)
-            for s in body:
-                self._gen_statement(s)
+            self._gen_block(body)
             if not self.builder.block.is_terminated:
                 self.builder.branch(merge_bb)
 
         # else ブロック
         if else_bb:
             self.builder.position_at_start(else_bb)
-            for s in stmt.else_body:
-                self._gen_statement(s)
+            self._gen_block(stmt.else_body)
             if not self.builder.block.is_terminated:
                 self.builder.branch(merge_bb)
 
@@ -272,9 +303,9 @@ class CodeGenerator:
     def _gen_while(self, stmt: WhileStatement) -> None:
         """ループ"""
         func = self.builder.function
-        cond_bb = func.append_basic_block("while.cond")
-        body_bb = func.append_basic_block("while.body")
-        merge_bb = func.append_basic_block("while.merge")
+        cond_bb = func.append_basic_block(self._fresh_bb("while.cond"))
+        body_bb = func.append_basic_block(self._fresh_bb("while.body"))
+        merge_bb = func.append_basic_block(self._fresh_bb("while.merge"))
 
         # 条件チェックへジャンプ
         self.builder.branch(cond_bb)
@@ -282,13 +313,12 @@ class CodeGenerator:
         # 条件ブロック
         self.builder.position_at_start(cond_bb)
         cond_val = self._gen_expression(stmt.condition)
-        cond_bool = self.builder.icmp_signed("!=", cond_val, ir.Constant(self.int_type, 0))
+        cond_bool = self.builder.icmp_signed("!=", cond_val, self._i64_zero)
         self.builder.cbranch(cond_bool, body_bb, merge_bb)
 
         # ボディブロック
         self.builder.position_at_start(body_bb)
-        for s in stmt.body:
-            self._gen_statement(s)
+        self._gen_block(stmt.body)
         if not self.builder.block.is_terminated:
             self.builder.branch(cond_bb)
 
@@ -300,6 +330,8 @@ class CodeGenerator:
         param_types = [self.int_type] * len(stmt.params)
         func_type = ir.FunctionType(self.int_type, param_types)
         func = ir.Function(self.module, func_type, name=stmt.name)
+        # モジュール外からは呼ばれないので internal にする（未使用なら最適化で削除される）
+        func.linkage = "internal"
         self.functions[stmt.name] = func
 
         block = func.append_basic_block("entry")
@@ -317,11 +349,10 @@ class CodeGenerator:
             self.variables[param] = alloca
 
         # ボディ
-        for s in stmt.body:
-            self._gen_statement(s)
+        self._gen_block(stmt.body)
 
         if not self.builder.block.is_terminated:
-            self.builder.ret(ir.Constant(self.int_type, 0))
+            self.builder.ret(self._i64_zero)
 
         # 復帰
         self.builder = saved_builder
@@ -329,41 +360,75 @@ class CodeGenerator:
 
     def _gen_expression(self, expr: Expression) -> ir.Value:
         """式のコード生成"""
-        if isinstance(expr, IntLiteral):
-            return ir.Constant(self.int_type, expr.value)
-
-        if isinstance(expr, FloatLiteral):
-            return ir.Constant(self.int_type, int(expr.value))
-
-        if isinstance(expr, Identifier):
-            if expr.name not in self.variables:
-                raise CodeGenError(f"未定義の変数: {expr.name}", expr.line)
-            return self.builder.load(self.variables[expr.name])
-
-        if isinstance(expr, BinaryOp):
-            left = self._gen_expression(expr.left)
-            right = self._gen_expression(expr.right)
-
-            if expr.op == "==":
-                result = self.builder.icmp_signed("==", left, right)
-                return self.builder.zext(result, self.int_type)
-            elif expr.op == "!=":
-                result = self.builder.icmp_signed("!=", left, right)
-                return self.builder.zext(result, self.int_type)
-            elif expr.op == ">":
-                result = self.builder.icmp_signed(">", left, right)
-                return self.builder.zext(result, self.int_type)
-            elif expr.op == "<":
-                result = self.builder.icmp_signed("<", left, right)
-                return self.builder.zext(result, self.int_type)
-            elif expr.op == "%":
-                return self.builder.srem(left, right)
-            else:
-                raise CodeGenError(f"未対応の演算子: {expr.op}", expr.line)
-
-        if isinstance(expr, StringLiteral):
-            # 文字列は直接値としては使えないため、ポインタを返す
-            str_val = self._create_global_string(expr.value)
-            return self._get_string_ptr(str_val)
-
-        raise CodeGenError(f"未対応の式: {type(expr).__name__}", expr.line)
+        handler = self._expr_dispatch.get(type(expr))
+        if handler is None:
+            raise CodeGenError(f"未対応の式: {type(expr).__name__}", expr.line)
+        return handler(expr)
+
+    def _gen_int_literal(self, expr: IntLiteral) -> ir.Value:
+        """整数リテラル"""
+        return ir.Constant(self.int_type, expr.value)
+
+    def _gen_float_literal(self, expr: FloatLiteral) -> ir.Value:
+        """浮動小数点リテラル（整数に切り捨て）"""
+        return ir.Constant(self.int_type, int(expr.value))
+
+    def _gen_identifier(self, expr: Identifier) -> ir.Value:
+        """変数参照"""
+        alloca = self.variables.get(expr.name)
+        if alloca is None:
+            raise CodeGenError(f"未定義の変数: {expr.name}", expr.line)
+        return self.builder.load(alloca)
+
+    def _gen_binary_op(self, expr: BinaryOp) -> ir.Value:
+        """二項演算"""
+        left = self._gen_expression(expr.left)
+        right = self._gen_expression(expr.right)
+
+        # 両辺が整数定数ならコンパイル時に計算する（icmp / zext を出さない）
+        if type(left) is ir.Constant and type(right) is ir.Constant:
+            folded = self._fold_binary_op(expr.op, left.constant, right.constant)
+            if folded is not None:
+                return ir.Constant(self.int_type, folded)
+
+        if expr.op == "==":
+            result = self.builder.icmp_signed("==", left, right)
+            return self.builder.zext(result, self.int_type)
+        elif expr.op == "!=":
+            result = self.builder.icmp_signed("!=", left, right)
+            return self.builder.zext(result, self.int_type)
+        elif expr.op == ">":
+            result = self.builder.icmp_signed(">", left, right)
+            return self.builder.zext(result, self.int_type)
+        elif expr.op == "<":
+            result = self.builder.icmp_signed("<", left, right)
+            return self.builder.zext(result, self.int_type)
+        elif expr.op == "%":
+            return self.builder.srem(left, right)
+        else:
+            raise CodeGenError(f"未対応の演算子: {expr.op}", expr.line)
+
+    def _fold_binary_op(self, op: str, left: int, right: int) -> int | None:
+        """リテラル同士の二項演算を計算する（畳み込めない場合は None）"""
+        # 範囲外のリテラルも実行時と同じく i64 に折り返してから比べる
+        left = wrap_int64(left)
+        right = wrap_int64(right)
+        if op == "==":
+            return int(left == right)
+        if op == "!=":
+            return int(left != right)
+        if op == ">":
+            return int(left > right)
+        if op == "<":
+            return int(left < right)
+        if op == "%" and right != 0:
+            # srem と同じく、余りの符号は左辺に合わせる
+            rem = abs(left) % abs(right)
+            return -rem if left < 0 else rem
+        return None
+
+    def _gen_string_literal(self, expr: StringLiteral) -> ir.Value:
+        """文字列リテラル"""
+        # 文字列は直接値としては使えないため、ポインタを返す
+        str_val = self._create_global_string(expr.value)
+        return self._get_string_ptr(str_val)
@@ -11,6 +11,9 @@ from llvmlite import ir, binding
 from tough.lexer import Lexer, LexerError
 from tough.parser import Parser, ParseError
 from tough.codegen import CodeGenerator, CodeGenError
+from tough.ast_nodes import Program
+from tough.cache import BoundedCache, hash_source
+from tough.interpreter import TreeWalker, count_simple_nodes, supports_tree_walk
 
 
 class CompileError(Exception):
@@ -18,22 +21,80 @@ class CompileError(Exception):
     pass
 
 
+def _close_engine(key: tuple[bytes, int], entry: tuple[binding.ExecutionEngine, object]) -> None:
+    """キャッシュからあふれた実行エンジンを破棄する"""
+    entry[0].close()
+
+
+# (ソースのハッシュ, 最適化レベル) → (実行エンジン, main 関数) のキャッシュ
+# MCJIT は remove_module してもコードを解放しないので、エンジンはソースごとに作り、
+# 古いものはエンジンごと破棄する（REPL などで入力ごとにメモリが増え続けないように）
+_ENGINE_CACHE_SIZE = 32
+_ENGINE_CACHE = BoundedCache(_ENGINE_CACHE_SIZE, on_evict=_close_engine)
+
+# ソースのハッシュ → LLVM IR テキストのキャッシュ
+_IR_CACHE_SIZE = 128
+_IR_CACHE = BoundedCache(_IR_CACHE_SIZE)
+
+
+# LLVM ターゲットの初期化はプロセスで一度だけ行う
+_TARGETS_INITED = False
+
+
+def _ensure_targets_inited() -> None:
+    """MCJIT に必要なネイティブターゲットだけを初期化する"""
+    global _TARGETS_INITED
+    if _TARGETS_INITED:
+        return
+    binding.initialize_native_target()
+    binding.initialize_native_asmprinter()
+    _TARGETS_INITED = True
+
+
 class Compiler:
     """TOUGH コンパイラ"""
 
-    def __init__(self):
-        binding.initialize_all_targets()
-        binding.initialize_all_asmprinters()
+    # ノード数がこれ未満の単純なプログラムは JIT せずにインタプリタで実行する
+    TREE_WALK_MAX_NODES = 32
 
-    def compile_source(self, source: str) -> ir.Module:
-        """TOUGH ソースコードを LLVM IR モジュールに変換する"""
+    # これより短いソースは最適化パスを走らせない（パスの実行時間の方が実行時間より長い）
+    OPTIMIZE_MIN_SOURCE_LEN = 256
+
+    # TargetMachine はソースに依存しないので、プロセスで一つだけ作る
+    _target_machine: binding.TargetMachine | None = None
+
+    def __init__(self, opt_level: int = 1):
+        # TOUGH のプログラムは小さいので、既定では軽い最適化に留める (0 で最適化なし)
+        self.opt_level = opt_level
+
+    # JIT 関連の初期化は最初の run まで遅らせる（emit_ir だけなら不要）
+    @classmethod
+    def _get_target_machine(cls) -> binding.TargetMachine:
+        """ターゲットを初期化し、TargetMachine を作成（2 回目以降は再利用）する"""
+        if cls._target_machine is None:
+            cls._target_machine = cls._create_target_machine()
+        return cls._target_machine
+
+    @staticmethod
+    def _create_target_machine() -> binding.TargetMachine:
+        """ターゲットを初期化し、新しい TargetMachine を作成する"""
+        _ensure_targets_inited()
+        target = binding.Target.from_default_triple()
+        return target.create_target_machine()
+
+    def parse_source(self, source: str) -> Program:
+        """TOUGH ソースコードを AST に変換する"""
         # 1. 字句解析
         lexer = Lexer(source)
         tokens = lexer.tokenize()
 
         # 2. 構文解析
         parser = Parser(tokens)
-        ast = parser.parse()
+        return parser.parse()
+
+    def compile_source(self, source: str) -> ir.Module:
+        """TOUGH ソースコードを LLVM IR モジュールに変換する"""
+        ast = self.parse_source(source)
 
         # 3. コード生成
         codegen = CodeGenerator()
@@ -43,39 +104,104 @@ class Compiler:
 
     def run(self, source: str) -> int:
         """TOUGH ソースコードをコンパイルして JIT 実行する"""
-        module = self.compile_source(source)
+        source_key = hash_source(source)
+        key = (source_key, self.opt_level)
+        cached = _ENGINE_CACHE.get(key)
+        if cached is not None:
+            # 同じソースは JIT 済みの main をそのまま呼ぶ
+            return cached[1]()
+
+        ast = None
+        if source_key not in _IR_CACHE:
+            ast = self.parse_source(source)
+            # 小さな単純なプログラムは LLVM の初期化・コンパイルの方が高くつく
+            if count_simple_nodes(ast, self.TREE_WALK_MAX_NODES) is not None:
+                return TreeWalker().run(ast)
+
+        # LLVM IR テキストは emit_ir と共有する（文字列化はソースごとに一度だけ）
+        llvm_ir = self._ir_text(source, source_key, ast)
+        optimize = self.opt_level > 0 and len(source) >= self.OPTIMIZE_MIN_SOURCE_LEN
+        mod = self._prepare_module(llvm_ir, self._get_target_machine(), optimize)
+
+        # 実行エンジンを作成する。モジュールと TargetMachine はエンジンが所有し、
+        # エンジンと一緒に破棄されるので、共有の TargetMachine は渡さない
+        engine = binding.create_mcjit_compiler(mod, self._create_target_machine())
+        engine.finalize_object()
+
+        # main 関数を取得して実行
+        main_ptr = engine.get_function_address("main")
+        main_func = CFUNCTYPE(c_int)(main_ptr)
+        _ENGINE_CACHE[key] = (engine, main_func)
+        result = main_func()
+
+        return result
 
-        # LLVM IR を文字列化してパース
-        llvm_ir = str(module)
+    def run_tree_walk(self, source: str) -> int:
+        """TOUGH ソースコードを LLVM を使わずに AST のまま実行する
+
+        入力や関数定義を含むなど、TreeWalker で扱えないプログラムは JIT で実行する。
+        """
+        ast = self.parse_source(source)
+        if not supports_tree_walk(ast.statements):
+            return self.run(source)
+        return TreeWalker().run(ast)
+
+    def _prepare_module(
+        self, llvm_ir: str, target_machine: binding.TargetMachine, optimize: bool,
+    ) -> binding.ModuleRef:
+        """IR テキストを一度だけパースし、検証・最適化まで同じ ModuleRef で行う"""
         mod = binding.parse_assembly(llvm_ir)
         mod.verify()
 
-        # 最適化 (PassManagerBuilder がない環境向けの対応)
-        try:
-            pmb = binding.create_pass_manager_builder()
-            pmb.opt_level = 2
+        # 最適化
+        if optimize:
+            self._optimize(mod, target_machine)
+
+        return mod
+
+    def _optimize(self, mod: binding.ModuleRef, target_machine: binding.TargetMachine) -> None:
+        """TOUGH の IR に効くパスだけを走らせる
+
+        alloca の昇格と単純化だけで十分なので、O2 のフルパイプラインは使わない。
+        どこからも呼ばれない関数は globaldce で落とし、JIT でコンパイルしない。
+        """
+        if hasattr(binding, "create_new_module_pass_manager"):
+            # 新しい llvmlite (New Pass Manager)
+            pm = binding.create_new_module_pass_manager()
+            pm.add_sroa_pass()
+            pm.add_instruction_combine_pass()
+            pm.add_simplify_cfg_pass()
+            pm.add_dead_code_elimination_pass()
+            pm.add_global_dead_code_eliminate_pass()
+            pto = binding.PipelineTuningOptions(speed_level=self.opt_level)
+            pb = binding.create_pass_builder(target_machine, pto)
+            pm.run(mod, pb)
+        else:
+            # 古い llvmlite (Legacy Pass Manager)
             pm = binding.create_module_pass_manager()
-            pmb.populate(pm)
+            pm.add_sroa_pass()
+            pm.add_instruction_combining_pass()
+            pm.add_cfg_simplification_pass()
+            pm.add_dead_code_elimination_pass()
+            pm.add_global_dce_pass()
             pm.run(mod)
-        except AttributeError:
-            pass  # 新しい llvmlite では PassManagerBuilder が削除されている可能性があるためスキップ
 
-        # JIT 実行エンジン
-        target = binding.Target.from_default_triple()
-        target_machine = target.create_target_machine()
-        engine = binding.create_mcjit_compiler(mod, target_machine)
+    def _ir_text(self, source: str, source_key: bytes, ast: Program | None = None) -> str:
+        """LLVM IR テキストをキャッシュから取得し、なければ生成する
 
-        # main 関数を取得して実行
-        main_ptr = engine.get_function_address("main")
-        main_func = CFUNCTYPE(c_int)(main_ptr)
-        result = main_func()
-
-        return result
+        ast にパース済みの AST を渡すと、キャッシュにない場合もパースし直さない。
+        """
+        llvm_ir = _IR_CACHE.get(source_key)
+        if llvm_ir is None:
+            if ast is None:
+                ast = self.parse_source(source)
+            llvm_ir = str(CodeGenerator().generate(ast))
+            _IR_CACHE[source_key] = llvm_ir
+        return llvm_ir
 
     def emit_ir(self, source: str) -> str:
         """TOUGH ソースコードから LLVM IR テキストを取得する"""
-        module = self.compile_source(source)
-        return str(module)
+        return self._ir_text(source, hash_source(source))
 
     def run_file(self, filepath: str) -> int:
         """TOUGH ファイルを読み込んでコンパイル＆実行する"""
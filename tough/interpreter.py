@@ -0,0 +1,229 @@
+"""TOUGH 言語 - 木構造インタプリタ
+
+小さなプログラムを LLVM を通さずに AST のまま実行する。
+JIT の初期化・コンパイルより速く終わる一度きりの実行向け。
+"""
+
+import sys
+
+from tough.ast_nodes import (
+    Program, ProgramStart, ProgramEnd, Comment,
+    DeclareStatement, AssignStatement, PrintStatement,
+    IncrementStatement, DecrementStatement,
+    IfStatement, WhileStatement, ThrowStatement,
+    IntLiteral, FloatLiteral, StringLiteral, Identifier, BinaryOp,
+    Expression, Statement,
+)
+from tough.codegen import CodeGenError, wrap_int64
+
+
+# インタプリタで扱える文・式（これ以外を含むプログラムは JIT で実行する）
+_SIMPLE_STATEMENTS = (
+    Comment, ProgramStart, ProgramEnd, DeclareStatement, AssignStatement,
+    PrintStatement, IncrementStatement, DecrementStatement, IfStatement,
+    ThrowStatement,
+)
+_SIMPLE_EXPRESSIONS = (IntLiteral, FloatLiteral, Identifier, BinaryOp)
+
+# TreeWalker が実行できる文（ループは実行時間が読めないので自動では選ばない）
+_TREE_WALK_STATEMENTS = _SIMPLE_STATEMENTS + (WhileStatement,)
+
+class _SimpleProgramCheck:
+    """インタプリタでも JIT と同じ結果になるプログラムかを調べる
+
+    JIT では未定義の変数がコード生成時（何も出力しないうち）にエラーになるので、
+    実行前に必ず定義済みと言える変数しか使わないプログラムだけを受け付ける。
+    % の右辺も 0 以外の整数リテラルに限る（JIT では 0 除算の結果が不定になるため）。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.count = 0
+
+    def _visit(self) -> bool:
+        self.count += 1
+        return self.count < self.limit
+
+    def block(self, stmts: list[Statement], defined: set[str]) -> bool:
+        """文リストを調べる（defined は定義済みの変数名。文の順に追加していく）"""
+        for stmt in stmts:
+            if not self._visit() or not isinstance(stmt, _SIMPLE_STATEMENTS):
+                return False
+
+            if isinstance(stmt, PrintStatement):
+                # 文字列は出力の引数としてのみ扱える
+                if not isinstance(stmt.value, StringLiteral) and not self.expr(stmt.value, defined):
+                    return False
+            elif isinstance(stmt, AssignStatement):
+                if not self.expr(stmt.value, defined):
+                    return False
+                defined.add(stmt.name)
+            elif isinstance(stmt, DeclareStatement):
+                defined.add(stmt.name)
+            elif isinstance(stmt, (IncrementStatement, DecrementStatement)):
+                if stmt.name not in defined:
+                    return False
+            elif isinstance(stmt, IfStatement):
+                # 分岐の中で定義した変数は、実行されない場合があるので外では未定義扱い
+                if not self.expr(stmt.condition, defined):
+                    return False
+                if not self.block(stmt.then_body, set(defined)):
+                    return False
+                for cond, body in stmt.elif_clauses:
+                    if not self.expr(cond, defined) or not self.block(body, set(defined)):
+                        return False
+                if not self.block(stmt.else_body, set(defined)):
+                    return False
+        return True
+
+    def expr(self, expr: Expression, defined: set[str]) -> bool:
+        """式を調べる"""
+        if not self._visit() or not isinstance(expr, _SIMPLE_EXPRESSIONS):
+            return False
+        if isinstance(expr, Identifier):
+            return expr.name in defined
+        if isinstance(expr, BinaryOp):
+            if expr.op == "%" and not (isinstance(expr.right, IntLiteral) and expr.right.value != 0):
+                return False
+            return self.expr(expr.left, defined) and self.expr(expr.right, defined)
+        return True
+
+
+def count_simple_nodes(program: Program, limit: int) -> int | None:
+    """インタプリタで実行できる場合はノード数を返す
+
+    扱えないノードを含む場合、未定義になりうる変数を使う場合、
+    またはノード数が limit 以上の場合は None を返す。
+    """
+    check = _SimpleProgramCheck(limit)
+    if not check.block(program.statements, set()):
+        return None
+    return check.count
+
+
+def supports_tree_walk(stmts: list[Statement]) -> bool:
+    """TreeWalker で実行できる文だけからなるかを調べる（入力・関数定義は扱えない）"""
+    for stmt in stmts:
+        if not isinstance(stmt, _TREE_WALK_STATEMENTS):
+            return False
+        if isinstance(stmt, IfStatement):
+            bodies = [stmt.then_body, *(body for _, body in stmt.elif_clauses), stmt.else_body]
+            if not all(supports_tree_walk(body) for body in bodies):
+                return False
+        elif isinstance(stmt, WhileStatement) and not supports_tree_walk(stmt.body):
+            return False
+    return True
+
+
+class TreeWalker:
+    """AST を直接実行するインタプリタ（int64 相当の整数のみ。桁あふれは折り返す）"""
+
+    def __init__(self):
+        self.variables: dict[str, int] = {}
+
+    def run(self, program: Program) -> int:
+        """プログラムを実行し、main の戻り値に相当する値を返す"""
+        try:
+            self._exec_block(program.statements)
+        finally:
+            sys.stdout.flush()
+        return 0
+
+    def _exec_block(self, stmts: list[Statement]) -> None:
+        for stmt in stmts:
+            self._exec(stmt)
+
+    def _exec(self, stmt: Statement) -> None:
+        """文を実行する"""
+        if isinstance(stmt, (Comment, ProgramStart)):
+            return
+
+        if isinstance(stmt, ProgramEnd):
+            sys.exit(0)
+
+        if isinstance(stmt, ThrowStatement):
+            sys.exit(1)
+
+        if isinstance(stmt, DeclareStatement):
+            self.variables[stmt.name] = 0
+            return
+
+        if isinstance(stmt, AssignStatement):
+            self.variables[stmt.name] = self._eval(stmt.value)
+            return
+
+        if isinstance(stmt, PrintStatement):
+            if isinstance(stmt.value, StringLiteral):
+                self._write_line(stmt.value.value)
+            else:
+                self._write_line(str(self._eval(stmt.value)))
+            return
+
+        if isinstance(stmt, IncrementStatement):
+            self.variables[stmt.name] = wrap_int64(self._lookup(stmt.name, stmt.line) + 1)
+            return
+
+        if isinstance(stmt, DecrementStatement):
+            self.variables[stmt.name] = wrap_int64(self._lookup(stmt.name, stmt.line) - 1)
+            return
+
+        if isinstance(stmt, IfStatement):
+            if self._eval(stmt.condition) != 0:
+                self._exec_block(stmt.then_body)
+                return
+            for cond, body in stmt.elif_clauses:
+                if self._eval(cond) != 0:
+                    self._exec_block(body)
+                    return
+            self._exec_block(stmt.else_body)
+            return
+
+        if isinstance(stmt, WhileStatement):
+            while self._eval(stmt.condition) != 0:
+                self._exec_block(stmt.body)
+            return
+
+        raise CodeGenError(f"未対応の文: {type(stmt).__name__}", stmt.line)
+
+    @staticmethod
+    def _write_line(text: str) -> None:
+        """JIT 版の puts/printf と同じく、端末のエンコーディングによらず UTF-8 で出力する"""
+        out = sys.stdout.buffer
+        out.write(text.encode("utf-8") + b"\n")
+        out.flush()
+
+    def _lookup(self, name: str, line: int) -> int:
+        value = self.variables.get(name)
+        if value is None:
+            raise CodeGenError(f"未定義の変数: {name}", line)
+        return value
+
+    def _eval(self, expr: Expression) -> int:
+        """式を評価する"""
+        if isinstance(expr, IntLiteral):
+            return wrap_int64(expr.value)
+
+        if isinstance(expr, FloatLiteral):
+            return wrap_int64(int(expr.value))
+
+        if isinstance(expr, Identifier):
+            return self._lookup(expr.name, expr.line)
+
+        if isinstance(expr, BinaryOp):
+            left = self._eval(expr.left)
+            right = self._eval(expr.right)
+            if expr.op == "==":
+                return int(left == right)
+            if expr.op == "!=":
+                return int(left != right)
+            if expr.op == ">":
+                return int(left > right)
+            if expr.op == "<":
+                return int(left < right)
+            if expr.op == "%":
+                # LLVM の srem と同じく、余りの符号は左辺に合わせる
+                rem = abs(left) % abs(right)
+                return wrap_int64(-rem if left < 0 else rem)
+            raise CodeGenError(f"未対応の演算子: {expr.op}", expr.line)
+
+        raise CodeGenError(f"未対応の式: {type(expr).__name__}", expr.line)
@@ -5,26 +5,75 @@ TOUGH ソースコードを行単位で解析し、トークン列に変換す
 """
 
 import re
+import sys
 from tough.tokens import Token, TokenType
 
 
+# 行パターン（優先度順）。1 つの正規表現にまとめ、マッチした名前で処理を振り分ける
+_LINE_RULES: list[tuple[str, str]] = [
+    ("comment", r"（(?P<comment_by>.+?)のコメント）(?P<comment_text>.*)$"),
+    ("program_start", r"我が名は[　\s]+尊鷹$"),
+    ("program_end", r"逃げるんかいっ$"),
+    ("throw", r"はっきり言ってそれって病気だから\s+お前死ぬよ$"),
+    ("declare", r"(?P<declare_name>.+?)だ\s+(?P=declare_name)が正体を現すぞ$"),
+    ("fn", r"自分たちの手で作るから尊いんだ\s+(?P<fn_name>.+?)が\s+\((?P<fn_args>.+?)\)るんだ\s*\{$"),
+    ("if", r"なにっ\s+\((?P<if_cond>.+?)\)\s*\{$"),
+    ("elif", r"いやちょっとまてよ\s+\((?P<elif_cond>.+?)\)\s*\{$"),
+    ("else", r"う[　\s]+あ[　\s]+あ[　\s]+あ[　\s]+あ[（(]\s*[ＰP][ＣC]書き文字\s*[）)]\s*\{$"),
+    ("while", r'禁断の[""「](?P<while_cond>.+?)度打ち[""」]\s*\{$'),
+    ("catch", r"\}\s*(?P<catch_var>.+?)\s+はルールで禁止スよね\s*\{$"),
+    ("rbrace", r"\}$"),
+    ("assign", r"(?P<assign_value>.+?)\s+を継ぐ\s+(?P<assign_target>.+)$"),
+    ("print", r"(?P<print_value>.+?)\s+しゃあっ$"),
+    ("input", r"(?P<input_name>.+?)\s+を教えてくれよ$"),
+    ("increment", r"(?P<increment_name>.+?)\s+進化したと言うてくれや$"),
+    ("decrement", r"(?P<decrement_name>.+?)\s+（哀）$"),
+]
+_LINE_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in _LINE_RULES))
+
+# 式内の 1 文字の記号
+_SYMBOL_TOKENS: dict[str, TokenType] = {
+    "%": TokenType.PERCENT,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+}
+
+# 行全体で 1 トークンになるキーワード
+_WHOLE_LINE_TOKENS: dict[str, TokenType] = {
+    "program_start": TokenType.PROGRAM_START,
+    "program_end": TokenType.PROGRAM_END,
+    "throw": TokenType.THROW,
+}
+
+# 式内のパターン
+_NUM_RE = re.compile(r"-?\d+(\.\d+)?")
+_IDENT_RE = re.compile(r"[a-zA-Z_\u3040-\u9fff][a-zA-Z0-9_\u3040-\u9fff]*")
+_WS_RE = re.compile(r"[ \t\u3000]+")
+
+
+def _build_keyword_trie(keywords: list[tuple[str, TokenType]]) -> dict:
+    """キーワードから 1 文字ずつの Trie を作る（終端は "" キーに (キーワード, 種別) を置く）"""
+    root: dict = {}
+    for keyword, token_type in keywords:
+        node = root
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = (keyword, token_type)
+    return root
+
+
 class LexerError(Exception):
     """字句解析エラー"""
-    def __init__(self, message: str, line: int):
+    def __init__(self, message: str, line: int, errors: list["LexerError"] | None = None):
         self.line = line
+        self.message = message
+        self.errors = errors if errors is not None else [self]
         super().__init__(f"行 {line}: {message}")
 
 
 class Lexer:
     """TOUGH 字句解析器"""
 
-    # 行全体でマッチするキーワードパターン（優先度順）
-    LINE_PATTERNS: list[tuple[str, TokenType]] = [
-        (r"^我が名は[　\s]+尊鷹$", TokenType.PROGRAM_START),
-        (r"^逃げるんかいっ$", TokenType.PROGRAM_END),
-        (r"^はっきり言ってそれって病気だから\s+お前死ぬよ$", TokenType.THROW),
-    ]
-
     # 行末キーワード（行の一部としてマッチ）
     SUFFIX_KEYWORDS: list[tuple[str, TokenType]] = [
         ("しゃあっ", TokenType.PRINT),
@@ -42,219 +91,266 @@ class Lexer:
         ("を超えた", TokenType.GT),
         ("に及ばない", TokenType.LT),
     ]
+    _EXPR_TRIE = _build_keyword_trie(EXPR_KEYWORDS)
 
     def __init__(self, source: str):
         self.source = source
         self.lines = source.splitlines()
         self.tokens: list[Token] = []
+        self.errors: list[LexerError] = []
 
     def tokenize(self) -> list[Token]:
-        """ソース全体をトークン化する"""
+        """ソース全体をトークン化する
+
+        エラーのある行は読み飛ばして最後まで解析し、見つかったエラーをまとめて送出する。
+        """
         self.tokens = []
+        self.errors = []
+        tokens = self.tokens
+        append = tokens.append
 
         for line_num, line in enumerate(self.lines, start=1):
             stripped = line.strip()
             if not stripped:
                 continue
 
-            self._tokenize_line(stripped, line_num)
-            self.tokens.append(Token(TokenType.NEWLINE, "\\n", line_num))
+            mark = len(tokens)
+            try:
+                self._tokenize_line(stripped, line_num)
+            except LexerError as e:
+                # 途中まで出したトークンを捨てて次の行から再開する
+                del tokens[mark:]
+                self.errors.append(e)
+                continue
+            append(Token(TokenType.NEWLINE, "\\n", line_num))
+
+        if self.errors:
+            raise self._collect_errors()
+
+        append(Token(TokenType.EOF, "", len(self.lines) + 1))
+        return tokens
 
-        self.tokens.append(Token(TokenType.EOF, "", len(self.lines) + 1))
-        return self.tokens
+    def _collect_errors(self) -> LexerError:
+        """記録したエラーを 1 つの LexerError にまとめる"""
+        first = self.errors[0]
+        if len(self.errors) == 1:
+            return first
+        rest = "\n".join(str(e) for e in self.errors[1:])
+        return LexerError(f"{first.message}\n{rest}", first.line, self.errors)
 
     def _tokenize_line(self, line: str, line_num: int) -> None:
         """1行をトークン化する"""
-
-        # --- コメント: （○○のコメント）... ---
-        m = re.match(r"^（(.+?)のコメント）(.*)$", line)
-        if m:
-            comment_text = m.group(2).strip() if m.group(2).strip() else f"{m.group(1)}のコメント"
-            self.tokens.append(Token(TokenType.COMMENT, comment_text, line_num))
-            return
-
-        # --- 行全体マッチパターン ---
-        for pattern, token_type in self.LINE_PATTERNS:
-            if re.match(pattern, line):
-                self.tokens.append(Token(token_type, line, line_num))
-                return
-
-        # --- 変数宣言: Xだ Xが正体を現すぞ ---
-        m = re.match(r"^(.+?)だ\s+\1が正体を現すぞ$", line)
-        if m:
-            var_name = m.group(1).strip()
-            self.tokens.append(Token(TokenType.DECLARE_DA, var_name, line_num))
-            self.tokens.append(Token(TokenType.DECLARE_REVEAL, var_name, line_num))
-            return
-
-        # --- 関数定義: 自分たちの手で作るから尊いんだ Xが (Y)るんだ { ---
-        m = re.match(
-            r"^自分たちの手で作るから尊いんだ\s+(.+?)が\s+\((.+?)\)るんだ\s*\{$",
-            line,
-        )
-        if m:
-            func_name = m.group(1).strip()
-            args = m.group(2).strip()
-            self.tokens.append(Token(TokenType.FN_PREFIX, "自分たちの手で作るから尊いんだ", line_num))
-            self.tokens.append(Token(TokenType.IDENT, func_name, line_num))
-            self.tokens.append(Token(TokenType.FN_GA, "が", line_num))
-            # 引数を分割
-            for arg in args.split(","):
-                self.tokens.append(Token(TokenType.IDENT, arg.strip(), line_num))
-            self.tokens.append(Token(TokenType.FN_RUNDA, "るんだ", line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- if: なにっ (条件) { ---
-        m = re.match(r"^なにっ\s+\((.+?)\)\s*\{$", line)
-        if m:
-            self.tokens.append(Token(TokenType.IF, "なにっ", line_num))
-            self.tokens.append(Token(TokenType.LPAREN, "(", line_num))
-            self._tokenize_expr(m.group(1).strip(), line_num)
-            self.tokens.append(Token(TokenType.RPAREN, ")", line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- elif: いやちょっとまてよ (条件) { ---
-        m = re.match(r"^いやちょっとまてよ\s+\((.+?)\)\s*\{$", line)
-        if m:
-            self.tokens.append(Token(TokenType.ELIF, "いやちょっとまてよ", line_num))
-            self.tokens.append(Token(TokenType.LPAREN, "(", line_num))
-            self._tokenize_expr(m.group(1).strip(), line_num)
-            self.tokens.append(Token(TokenType.RPAREN, ")", line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- else: う　あ　あ　あ　あ（ＰＣ書き文字） { ---
-        m = re.match(r"^う[　\s]+あ[　\s]+あ[　\s]+あ[　\s]+あ[（(]\s*[ＰP][ＣC]書き文字\s*[）)]\s*\{$", line)
-        if m:
-            self.tokens.append(Token(TokenType.ELSE, "う　あ　あ　あ　あ（ＰＣ書き文字）", line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- while: 禁断の"(条件)度打ち" { ---
-        m = re.match(r'^禁断の[""「](.+?)度打ち[""」]\s*\{$', line)
-        if m:
-            self.tokens.append(Token(TokenType.WHILE, "禁断の", line_num))
-            self.tokens.append(Token(TokenType.LPAREN, "(", line_num))
-            self._tokenize_expr(m.group(1).strip(), line_num)
-            self.tokens.append(Token(TokenType.RPAREN, ")", line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- catch: } X はルールで禁止スよね { ---
-        m = re.match(r"^\}\s*(.+?)\s+はルールで禁止スよね\s*\{$", line)
-        if m:
-            var_name = m.group(1).strip()
-            self.tokens.append(Token(TokenType.RBRACE, "}", line_num))
-            self.tokens.append(Token(TokenType.CATCH, "はルールで禁止スよね", line_num))
-            self.tokens.append(Token(TokenType.IDENT, var_name, line_num))
-            self.tokens.append(Token(TokenType.LBRACE, "{", line_num))
-            return
-
-        # --- ブロック終了: } ---
-        if line == "}":
-            self.tokens.append(Token(TokenType.RBRACE, "}", line_num))
-            return
-
-        # --- 代入: (値) を継ぐ (変数) ---
-        m = re.match(r"^(.+?)\s+を継ぐ\s+(.+)$", line)
-        if m:
-            self._tokenize_expr(m.group(1).strip(), line_num)
-            self.tokens.append(Token(TokenType.ASSIGN_TSUGU, "を継ぐ", line_num))
-            self.tokens.append(Token(TokenType.IDENT, m.group(2).strip(), line_num))
-            return
-
-        # --- 出力: (値) しゃあっ ---
-        m = re.match(r"^(.+?)\s+しゃあっ$", line)
-        if m:
-            self._tokenize_expr(m.group(1).strip(), line_num)
-            self.tokens.append(Token(TokenType.PRINT, "しゃあっ", line_num))
-            return
-
-        # --- 入力: (変数) を教えてくれよ ---
-        m = re.match(r"^(.+?)\s+を教えてくれよ$", line)
-        if m:
-            self.tokens.append(Token(TokenType.IDENT, m.group(1).strip(), line_num))
-            self.tokens.append(Token(TokenType.INPUT, "を教えてくれよ", line_num))
-            return
-
-        # --- インクリメント: (変数) 進化したと言うてくれや ---
-        m = re.match(r"^(.+?)\s+進化したと言うてくれや$", line)
-        if m:
-            self.tokens.append(Token(TokenType.IDENT, m.group(1).strip(), line_num))
-            self.tokens.append(Token(TokenType.INCREMENT, "進化したと言うてくれや", line_num))
-            return
-
-        # --- デクリメント: (変数) （哀） ---
-        m = re.match(r"^(.+?)\s+（哀）$", line)
-        if m:
-            self.tokens.append(Token(TokenType.IDENT, m.group(1).strip(), line_num))
-            self.tokens.append(Token(TokenType.DECREMENT, "（哀）", line_num))
-            return
-
-        raise LexerError(f"認識できない構文: {line}", line_num)
+        m = _LINE_RE.match(line)
+        if m is None:
+            raise LexerError(f"認識できない構文: {line}", line_num)
+        self._LINE_HANDLERS[m.lastgroup](self, m, line, line_num)
+
+    # --- コメント: （○○のコメント）... ---
+    def _lex_comment(self, m: re.Match, line: str, line_num: int) -> None:
+        text = m.group("comment_text").strip()
+        comment_text = text if text else f"{m.group('comment_by')}のコメント"
+        self.tokens.append(Token(TokenType.COMMENT, comment_text, line_num))
+
+    # --- 行全体マッチ: プログラム開始・終了・例外送出 ---
+    def _lex_whole_line(self, m: re.Match, line: str, line_num: int) -> None:
+        self.tokens.append(Token(_WHOLE_LINE_TOKENS[m.lastgroup], line, line_num))
+
+    # --- 変数宣言: Xだ Xが正体を現すぞ ---
+    def _lex_declare(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        var_name = sys.intern(m.group("declare_name").strip())
+        append(Token(TokenType.DECLARE_DA, var_name, line_num))
+        append(Token(TokenType.DECLARE_REVEAL, var_name, line_num))
+
+    # --- 関数定義: 自分たちの手で作るから尊いんだ Xが (Y)るんだ { ---
+    def _lex_fn(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        func_name = sys.intern(m.group("fn_name").strip())
+        args = m.group("fn_args").strip()
+        append(Token(TokenType.FN_PREFIX, "自分たちの手で作るから尊いんだ", line_num))
+        append(Token(TokenType.IDENT, func_name, line_num))
+        append(Token(TokenType.FN_GA, "が", line_num))
+        # 引数を分割
+        for arg in args.split(","):
+            append(Token(TokenType.IDENT, sys.intern(arg.strip()), line_num))
+        append(Token(TokenType.FN_RUNDA, "るんだ", line_num))
+        append(Token(TokenType.LBRACE, "{", line_num))
+
+    # --- if: なにっ (条件) { ---
+    def _lex_if(self, m: re.Match, line: str, line_num: int) -> None:
+        self.tokens.append(Token(TokenType.IF, "なにっ", line_num))
+        self._lex_condition(m.group("if_cond"), line_num)
+
+    # --- elif: いやちょっとまてよ (条件) { ---
+    def _lex_elif(self, m: re.Match, line: str, line_num: int) -> None:
+        self.tokens.append(Token(TokenType.ELIF, "いやちょっとまてよ", line_num))
+        self._lex_condition(m.group("elif_cond"), line_num)
+
+    # --- else: う　あ　あ　あ　あ（ＰＣ書き文字） { ---
+    def _lex_else(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        append(Token(TokenType.ELSE, "う　あ　あ　あ　あ（ＰＣ書き文字）", line_num))
+        append(Token(TokenType.LBRACE, "{", line_num))
+
+    # --- while: 禁断の"(条件)度打ち" { ---
+    def _lex_while(self, m: re.Match, line: str, line_num: int) -> None:
+        self.tokens.append(Token(TokenType.WHILE, "禁断の", line_num))
+        self._lex_condition(m.group("while_cond"), line_num)
+
+    def _lex_condition(self, cond: str, line_num: int) -> None:
+        """制御構文の ( 条件 ) { 部分をトークン化する"""
+        append = self.tokens.append
+        append(Token(TokenType.LPAREN, "(", line_num))
+        self._tokenize_expr(cond.strip(), line_num)
+        append(Token(TokenType.RPAREN, ")", line_num))
+        append(Token(TokenType.LBRACE, "{", line_num))
+
+    # --- catch: } X はルールで禁止スよね { ---
+    def _lex_catch(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        var_name = sys.intern(m.group("catch_var").strip())
+        append(Token(TokenType.RBRACE, "}", line_num))
+        append(Token(TokenType.CATCH, "はルールで禁止スよね", line_num))
+        append(Token(TokenType.IDENT, var_name, line_num))
+        append(Token(TokenType.LBRACE, "{", line_num))
+
+    # --- ブロック終了: } ---
+    def _lex_rbrace(self, m: re.Match, line: str, line_num: int) -> None:
+        self.tokens.append(Token(TokenType.RBRACE, "}", line_num))
+
+    # --- 代入: (値) を継ぐ (変数) ---
+    def _lex_assign(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        self._tokenize_expr(m.group("assign_value").strip(), line_num)
+        append(Token(TokenType.ASSIGN_TSUGU, "を継ぐ", line_num))
+        append(Token(TokenType.IDENT, sys.intern(m.group("assign_target").strip()), line_num))
+
+    # --- 出力: (値) しゃあっ ---
+    def _lex_print(self, m: re.Match, line: str, line_num: int) -> None:
+        self._tokenize_expr(m.group("print_value").strip(), line_num)
+        self.tokens.append(Token(TokenType.PRINT, "しゃあっ", line_num))
+
+    # --- 入力: (変数) を教えてくれよ ---
+    def _lex_input(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        append(Token(TokenType.IDENT, sys.intern(m.group("input_name").strip()), line_num))
+        append(Token(TokenType.INPUT, "を教えてくれよ", line_num))
+
+    # --- インクリメント: (変数) 進化したと言うてくれや ---
+    def _lex_increment(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        append(Token(TokenType.IDENT, sys.intern(m.group("increment_name").strip()), line_num))
+        append(Token(TokenType.INCREMENT, "進化したと言うてくれや", line_num))
+
+    # --- デクリメント: (変数) （哀） ---
+    def _lex_decrement(self, m: re.Match, line: str, line_num: int) -> None:
+        append = self.tokens.append
+        append(Token(TokenType.IDENT, sys.intern(m.group("decrement_name").strip()), line_num))
+        append(Token(TokenType.DECREMENT, "（哀）", line_num))
+
+    # _LINE_RULES の名前 → 処理メソッド
+    _LINE_HANDLERS = {
+        "comment": _lex_comment,
+        "program_start": _lex_whole_line,
+        "program_end": _lex_whole_line,
+        "throw": _lex_whole_line,
+        "declare": _lex_declare,
+        "fn": _lex_fn,
+        "if": _lex_if,
+        "elif": _lex_elif,
+        "else": _lex_else,
+        "while": _lex_while,
+        "catch": _lex_catch,
+        "rbrace": _lex_rbrace,
+        "assign": _lex_assign,
+        "print": _lex_print,
+        "input": _lex_input,
+        "increment": _lex_increment,
+        "decrement": _lex_decrement,
+    }
 
     def _tokenize_expr(self, expr: str, line_num: int) -> None:
         """式をトークン化する（比較演算子・数値・識別子・文字列・%）"""
+        append = self.tokens.append
+        dispatch = self._EXPR_DISPATCH
+        trie = self._EXPR_TRIE
         pos = 0
         while pos < len(expr):
-            # 空白スキップ
-            if expr[pos] in " \t　":
-                pos += 1
+            c = expr[pos]
+
+            # 先頭文字だけで決まるもの（空白・文字列・記号）
+            handler = dispatch.get(c)
+            if handler is not None:
+                pos = handler(self, expr, pos, line_num)
                 continue
 
             # 式内キーワード（比較演算子）
-            matched = False
-            for keyword, token_type in self.EXPR_KEYWORDS:
-                if expr[pos:].startswith(keyword):
-                    self.tokens.append(Token(token_type, keyword, line_num))
+            if c in trie:
+                keyword_match = self._match_keyword(expr, pos)
+                if keyword_match is not None:
+                    keyword, token_type = keyword_match
+                    append(Token(token_type, keyword, line_num))
                     pos += len(keyword)
-                    matched = True
-                    break
-            if matched:
-                continue
-
-            # 文字列リテラル 「...」
-            if expr[pos] == "「":
-                end = expr.index("」", pos + 1)
-                self.tokens.append(Token(TokenType.STRING, expr[pos + 1:end], line_num))
-                pos = end + 1
-                continue
+                    continue
 
             # 数値リテラル
-            if expr[pos].isdigit() or (expr[pos] == "-" and pos + 1 < len(expr) and expr[pos + 1].isdigit()):
-                m = re.match(r"-?\d+(\.\d+)?", expr[pos:])
+            if c.isdigit() or (c == "-" and pos + 1 < len(expr) and expr[pos + 1].isdigit()):
+                m = _NUM_RE.match(expr, pos)
                 if m:
                     val = m.group(0)
-                    if "." in val:
-                        self.tokens.append(Token(TokenType.FLOAT, val, line_num))
+                    if m.group(1):
+                        append(Token(TokenType.FLOAT, val, line_num, float(val)))
                     else:
-                        self.tokens.append(Token(TokenType.INT, val, line_num))
-                    pos += len(val)
+                        append(Token(TokenType.INT, val, line_num, int(val)))
+                    pos = m.end()
                     continue
 
-            # パーセント記号
-            if expr[pos] == "%":
-                self.tokens.append(Token(TokenType.PERCENT, "%", line_num))
-                pos += 1
-                continue
-
-            # 括弧
-            if expr[pos] == "(":
-                self.tokens.append(Token(TokenType.LPAREN, "(", line_num))
-                pos += 1
-                continue
-            if expr[pos] == ")":
-                self.tokens.append(Token(TokenType.RPAREN, ")", line_num))
-                pos += 1
-                continue
-
             # 識別子（英数字 + アンダースコア + 日本語）
-            m = re.match(r"[a-zA-Z_\u3040-\u9fff][a-zA-Z0-9_\u3040-\u9fff]*", expr[pos:])
+            m = _IDENT_RE.match(expr, pos)
             if m:
-                self.tokens.append(Token(TokenType.IDENT, m.group(0), line_num))
-                pos += len(m.group(0))
+                append(Token(TokenType.IDENT, sys.intern(m.group(0)), line_num))
+                pos = m.end()
                 continue
 
-            raise LexerError(f"認識できない文字: {expr[pos]!r}", line_num)
+            raise LexerError(f"認識できない文字: {c!r}", line_num)
+
+    # 空白スキップ（連続する空白をまとめて読み飛ばす）
+    def _skip_space(self, expr: str, pos: int, line_num: int) -> int:
+        return _WS_RE.match(expr, pos).end()
+
+    # 文字列リテラル 「...」
+    def _scan_string(self, expr: str, pos: int, line_num: int) -> int:
+        end = expr.find("」", pos + 1)
+        if end == -1:
+            raise LexerError("文字列リテラルが閉じていません", line_num)
+        self.tokens.append(Token(TokenType.STRING, expr[pos + 1:end], line_num))
+        return end + 1
+
+    # パーセント記号・括弧
+    def _scan_symbol(self, expr: str, pos: int, line_num: int) -> int:
+        c = expr[pos]
+        self.tokens.append(Token(_SYMBOL_TOKENS[c], c, line_num))
+        return pos + 1
+
+    # 先頭文字 → 処理メソッド
+    _EXPR_DISPATCH = {
+        " ": _skip_space,
+        "\t": _skip_space,
+        "　": _skip_space,
+        "「": _scan_string,
+        "%": _scan_symbol,
+        "(": _scan_symbol,
+        ")": _scan_symbol,
+    }
+
+    def _match_keyword(self, expr: str, pos: int) -> tuple[str, TokenType] | None:
+        """pos から始まる最長の式内キーワードを Trie で探す"""
+        node = self._EXPR_TRIE
+        found = None
+        while pos < len(expr):
+            node = node.get(expr[pos])
+            if node is None:
+                break
+            found = node.get("", found)
+            pos += 1
+        return found
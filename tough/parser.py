@@ -14,6 +14,19 @@ from tough.ast_nodes import (
 )
 
 
+# 二項演算子のトークン種別 → 演算子文字列
+_OP_MAP: dict[TokenType, str] = {
+    TokenType.EQ: "==",
+    TokenType.NEQ: "!=",
+    TokenType.GT: ">",
+    TokenType.LT: "<",
+    TokenType.PERCENT: "%",
+}
+
+# ブロックの終わりを示すトークン種別
+_BLOCK_END = frozenset({TokenType.RBRACE, TokenType.EOF})
+
+
 class ParseError(Exception):
     """構文解析エラー"""
     def __init__(self, message: str, line: int = 0):
@@ -54,8 +67,11 @@ class Parser:
         return self._advance()
 
     def _skip_newlines(self) -> None:
-        while self._current().type == TokenType.NEWLINE:
-            self._advance()
+        tokens = self.tokens
+        pos = self.pos
+        while pos < len(tokens) and tokens[pos].type == TokenType.NEWLINE:
+            pos += 1
+        self.pos = pos
 
     def parse(self) -> Program:
         """トークン列をパースして Program AST を返す"""
@@ -72,49 +88,35 @@ class Parser:
 
     def _parse_statement(self) -> Statement | None:
         """1つの文をパースする"""
-        tok = self._current()
-
-        if tok.type == TokenType.COMMENT:
-            self._advance()
-            self._skip_newlines()
-            return Comment(text=tok.value, line=tok.line)
-
-        if tok.type == TokenType.PROGRAM_START:
-            self._advance()
-            self._skip_newlines()
-            return ProgramStart(line=tok.line)
-
-        if tok.type == TokenType.PROGRAM_END:
-            self._advance()
-            self._skip_newlines()
-            return ProgramEnd(line=tok.line)
-
-        if tok.type == TokenType.THROW:
-            self._advance()
-            self._skip_newlines()
-            return ThrowStatement(line=tok.line)
-
-        if tok.type == TokenType.DECLARE_DA:
-            return self._parse_declare()
-
-        if tok.type == TokenType.FN_PREFIX:
-            return self._parse_function()
-
-        if tok.type == TokenType.IF:
-            return self._parse_if()
-
-        if tok.type == TokenType.WHILE:
-            return self._parse_while()
-
-        # 式で始まる文（代入・出力・インクリメント・デクリメント）
-        return self._parse_expr_statement()
+        # 式で始まる文（代入・出力・インクリメント・デクリメント）はフォールバック
+        handler = self._STMT_DISPATCH.get(self._current().type, Parser._parse_expr_statement)
+        return handler(self)
+
+    def _parse_comment(self) -> Comment:
+        """コメントをパースする"""
+        tok = self._advance()
+        return Comment(text=tok.value, line=tok.line)
+
+    def _parse_program_start(self) -> ProgramStart:
+        """プログラム開始をパースする"""
+        tok = self._advance()
+        return ProgramStart(line=tok.line)
+
+    def _parse_program_end(self) -> ProgramEnd:
+        """プログラム終了をパースする"""
+        tok = self._advance()
+        return ProgramEnd(line=tok.line)
+
+    def _parse_throw(self) -> ThrowStatement:
+        """例外送出をパースする"""
+        tok = self._advance()
+        return ThrowStatement(line=tok.line)
 
     def _parse_declare(self) -> DeclareStatement:
         """変数宣言をパースする"""
         tok = self._advance()  # DECLARE_DA
         var_name = tok.value
         self._expect(TokenType.DECLARE_REVEAL)
-        self._skip_newlines()
         return DeclareStatement(name=var_name, line=tok.line)
 
     def _parse_function(self) -> FnStatement:
@@ -131,7 +133,6 @@ class Parser:
 
         self._expect(TokenType.FN_RUNDA)
         self._expect(TokenType.LBRACE)
-        self._skip_newlines()
 
         body = self._parse_block()
 
@@ -144,7 +145,6 @@ class Parser:
         condition = self._parse_expression()
         self._expect(TokenType.RPAREN)
         self._expect(TokenType.LBRACE)
-        self._skip_newlines()
         then_body = self._parse_block()
 
         elif_clauses: list[tuple[Expression, list[Statement]]] = []
@@ -156,14 +156,12 @@ class Parser:
             elif_cond = self._parse_expression()
             self._expect(TokenType.RPAREN)
             self._expect(TokenType.LBRACE)
-            self._skip_newlines()
             elif_body = self._parse_block()
             elif_clauses.append((elif_cond, elif_body))
 
         if self._current().type == TokenType.ELSE:
             self._advance()  # ELSE
             self._expect(TokenType.LBRACE)
-            self._skip_newlines()
             else_body = self._parse_block()
 
         return IfStatement(
@@ -181,14 +179,14 @@ class Parser:
         condition = self._parse_expression()
         self._expect(TokenType.RPAREN)
         self._expect(TokenType.LBRACE)
-        self._skip_newlines()
         body = self._parse_block()
         return WhileStatement(condition=condition, body=body, line=tok.line)
 
     def _parse_block(self) -> list[Statement]:
         """} が来るまでの文リストをパースする"""
         stmts: list[Statement] = []
-        while self._current().type not in (TokenType.RBRACE, TokenType.EOF):
+        self._skip_newlines()
+        while self._current().type not in _BLOCK_END:
             stmt = self._parse_statement()
             if stmt is not None:
                 stmts.append(stmt)
@@ -210,21 +208,18 @@ class Parser:
             if next_tok.type == TokenType.INCREMENT:
                 self._advance()  # IDENT
                 self._advance()  # INCREMENT
-                self._skip_newlines()
                 return IncrementStatement(name=tok.value, line=tok.line)
 
             # デクリメント
             if next_tok.type == TokenType.DECREMENT:
                 self._advance()  # IDENT
                 self._advance()  # DECREMENT
-                self._skip_newlines()
                 return DecrementStatement(name=tok.value, line=tok.line)
 
             # 入力
             if next_tok.type == TokenType.INPUT:
                 self._advance()  # IDENT
                 self._advance()  # INPUT
-                self._skip_newlines()
                 return InputStatement(name=tok.value, line=tok.line)
 
         # 式をパースし、次のトークンで文の種類を決定
@@ -235,60 +230,76 @@ class Parser:
         # 出力: ... しゃあっ
         if cur.type == TokenType.PRINT:
             self._advance()
-            self._skip_newlines()
             return PrintStatement(value=expr, line=tok.line)
 
         # 代入: ... を継ぐ (変数)
         if cur.type == TokenType.ASSIGN_TSUGU:
             self._advance()
             var_tok = self._expect(TokenType.IDENT)
-            self._skip_newlines()
             return AssignStatement(name=var_tok.value, value=expr, line=tok.line)
 
         raise ParseError(f"文の終端が不正: {cur.type.name}", cur.line)
 
     def _parse_expression(self) -> Expression:
         """式をパースする（比較演算子）"""
+        tokens = self.tokens
         left = self._parse_primary()
 
-        while self._current().type in (TokenType.EQ, TokenType.NEQ, TokenType.GT, TokenType.LT, TokenType.PERCENT):
-            op_tok = self._advance()
-            op_map = {
-                TokenType.EQ: "==",
-                TokenType.NEQ: "!=",
-                TokenType.GT: ">",
-                TokenType.LT: "<",
-                TokenType.PERCENT: "%",
-            }
+        while self.pos < len(tokens) and tokens[self.pos].type in _OP_MAP:
+            op_tok = tokens[self.pos]
+            self.pos += 1
             right = self._parse_primary()
-            left = BinaryOp(op=op_map[op_tok.type], left=left, right=right, line=op_tok.line)
+            left = BinaryOp(op=_OP_MAP[op_tok.type], left=left, right=right, line=op_tok.line)
 
         return left
 
     def _parse_primary(self) -> Expression:
         """基本式（リテラル・識別子・括弧）をパースする"""
         tok = self._current()
+        handler = self._PRIMARY_DISPATCH.get(tok.type)
+        if handler is None:
+            raise ParseError(f"式が期待されましたが {tok.type.name} が見つかりました", tok.line)
+        return handler(self)
 
-        if tok.type == TokenType.INT:
-            self._advance()
-            return IntLiteral(value=int(tok.value), line=tok.line)
+    def _parse_int(self) -> IntLiteral:
+        tok = self._advance()
+        return IntLiteral(value=tok.num, line=tok.line)
 
-        if tok.type == TokenType.FLOAT:
-            self._advance()
-            return FloatLiteral(value=float(tok.value), line=tok.line)
+    def _parse_float(self) -> FloatLiteral:
+        tok = self._advance()
+        return FloatLiteral(value=tok.num, line=tok.line)
 
-        if tok.type == TokenType.STRING:
-            self._advance()
-            return StringLiteral(value=tok.value, line=tok.line)
-
-        if tok.type == TokenType.IDENT:
-            self._advance()
-            return Identifier(name=tok.value, line=tok.line)
+    def _parse_string(self) -> StringLiteral:
+        tok = self._advance()
+        return StringLiteral(value=tok.value, line=tok.line)
 
-        if tok.type == TokenType.LPAREN:
-            self._advance()
-            expr = self._parse_expression()
-            self._expect(TokenType.RPAREN)
-            return expr
+    def _parse_identifier(self) -> Identifier:
+        tok = self._advance()
+        return Identifier(name=tok.value, line=tok.line)
 
-        raise ParseError(f"式が期待されましたが {tok.type.name} が見つかりました", tok.line)
+    def _parse_paren(self) -> Expression:
+        self._advance()  # (
+        expr = self._parse_expression()
+        self._expect(TokenType.RPAREN)
+        return expr
+
+    # 文の先頭トークン → パースメソッド
+    _STMT_DISPATCH = {
+        TokenType.COMMENT: _parse_comment,
+        TokenType.PROGRAM_START: _parse_program_start,
+        TokenType.PROGRAM_END: _parse_program_end,
+        TokenType.THROW: _parse_throw,
+        TokenType.DECLARE_DA: _parse_declare,
+        TokenType.FN_PREFIX: _parse_function,
+        TokenType.IF: _parse_if,
+        TokenType.WHILE: _parse_while,
+    }
+
+    # 基本式の先頭トークン → パースメソッド
+    _PRIMARY_DISPATCH = {
+        TokenType.INT: _parse_int,
+        TokenType.FLOAT: _parse_float,
+        TokenType.STRING: _parse_string,
+        TokenType.IDENT: _parse_identifier,
+        TokenType.LPAREN: _parse_paren,
+    }
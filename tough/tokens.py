@@ -1,10 +1,10 @@
 """TOUGH 言語 - トークン定義"""
 
-from enum import Enum, auto
+from enum import IntEnum, auto
 from dataclasses import dataclass
 
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     """トークン種別"""
 
     # リテラル
@@ -64,12 +64,13 @@ class TokenType(Enum):
     EOF = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """トークン"""
     type: TokenType
     value: str
     line: int
+    num: int | float | None = None  # INT / FLOAT の数値（字句解析時に変換済み）
 
     def __repr__(self) -> str:
         return f"Token({self.type.name}, {self.value!r}, line={self.line})"
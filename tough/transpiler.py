@@ -6,6 +6,61 @@ TOUGH ソースコードの各行を正規表現でマッチし、
 
 import re
 import sys
+from types import CodeType
+
+from tough.cache import BoundedCache, hash_source
+
+
+# 行パターン（ToughTranspiler._LINE_RULES で使う）
+_COMMENT_RE = re.compile(r"^（(.+?)のコメント）(.*)$")
+_PROGRAM_START_RE = re.compile(r"^我が名は\s+尊鷹$")
+_DECLARE_RE = re.compile(r"^(.+?)だ\s+\1が正体を現すぞ$")
+_ASSIGN_RE = re.compile(r"^(.+?)\s+を継ぐ\s+(.+)$")
+_PRINT_RE = re.compile(r"^(.+?)\s+しゃあっ$")
+_INPUT_RE = re.compile(r"^(.+?)\s+を教えてくれよ$")
+_INCREMENT_RE = re.compile(r"^(.+?)\s+進化したと言うてくれや$")
+_DECREMENT_RE = re.compile(r"^(.+?)\s+（哀）$")
+_FN_RE = re.compile(r"^自分たちの手で作るから尊いんだ\s+(.+?)が\s+\((.+?)\)るんだ\s*\{$")
+_IF_RE = re.compile(r"^なにっ\s+\((.+?)\)\s*\{$")
+_ELIF_RE = re.compile(r"^いやちょっとまてよ\s+\((.+?)\)\s*\{$")
+_ELSE_RE = re.compile(r"^う\s+あ\s+あ\s+あ\s+あ[（(]\s*[ＰP][ＣC]書き文字\s*[）)]\s*\{$")
+_WHILE_RE = re.compile(r'^禁断の[""「](.+?)度打ち[""」]\s*\{$')
+_CATCH_RE = re.compile(r"^\}\s*(.+?)\s+はルールで禁止スよね\s*\{$")
+_THROW_RE = re.compile(r"^はっきり言ってそれって病気だから\s+お前死ぬよ$")
+
+# 行全体が決まった文字列になる文 → 変換後の Python 行（インデントは除く）
+# 表記揺れのある書き方は _LINE_RULES の正規表現で扱う
+_EXACT_LINES: dict[str, str] = {
+    "我が名は　尊鷹": "import sys",
+    "逃げるんかいっ": "sys.exit(0)",
+    "はっきり言ってそれって病気だから お前死ぬよ": "raise Exception()",
+}
+
+# else の標準的な書き方（README の表記）。これと一致する行は正規表現を使わない
+_ELSE_LINE = "う　あ　あ　あ　あ（ＰＣ書き文字） {"
+
+# 式内のパターン
+# 比較演算子（長いものを先に並べ、ガチンコじゃない を ガチンコ より優先する）
+_OP_MAP: dict[str, str] = {
+    "ガチンコじゃない": " != ",
+    "ガチンコ": " == ",
+    "を超えた": " > ",
+    "に及ばない": " < ",
+}
+# 演算子の前後の空白も一緒に取り込み、置換と同時に 1 つの空白にそろえる
+_OP_RE = re.compile(r"\s*(" + "|".join(map(re.escape, _OP_MAP)) + r")\s*")
+_STRING_RE = re.compile(r"「(.+?)」")
+_WS_RE = re.compile(r"\s+")
+# 整理が必要な空白（空白以外の空白文字、または連続した空白）
+_IRREGULAR_WS_RE = re.compile(r"[^\S ]| {2}")
+
+# インデント文字列の表（深さ 64 未満はここから引く）
+_INDENTS = tuple("    " * i for i in range(64))
+
+
+def _replace_op(m: re.Match) -> str:
+    """比較演算子のキーワードを Python の演算子に置き換える"""
+    return _OP_MAP[m.group(1)]
 
 
 class ToughTranspileError(Exception):
@@ -22,15 +77,13 @@ class ToughTranspiler:
     def __init__(self):
         self._indent_level = 0
         self._indent_stack: list[int] = []
-
-    def _indent(self) -> str:
-        """現在のインデントレベルに応じた空白文字列を返す"""
-        return "    " * self._indent_level
+        self._indent_str = ""  # 現在のインデントレベルに応じた空白文字列
 
     def _open_block(self) -> None:
         """新しいブロックを開く（インデントレベルを1上げる）"""
         self._indent_stack.append(self._indent_level)
         self._indent_level += 1
+        self._update_indent_str()
 
     def _close_block(self) -> None:
         """ブロックを閉じる（インデントレベルを戻す）"""
@@ -38,6 +91,15 @@ class ToughTranspiler:
             self._indent_level = self._indent_stack.pop()
         else:
             self._indent_level = max(0, self._indent_level - 1)
+        self._update_indent_str()
+
+    def _update_indent_str(self) -> None:
+        """インデントレベルに応じた空白文字列を表から引き直す"""
+        level = self._indent_level
+        if level < len(_INDENTS):
+            self._indent_str = _INDENTS[level]
+        else:
+            self._indent_str = "    " * level
 
     def _transpile_line(self, line: str, line_number: int) -> str | None:
         """1行のTOUGHコードをPythonコードに変換する
@@ -56,138 +118,166 @@ class ToughTranspiler:
             self._close_block()
             return None  # Python ではブロック終了記号は不要
 
-        # --- コメント: （○○のコメント）コメント内容 ---
-        # （○○のコメント）が Python の # に相当。○○は何でも良い。
-        m = re.match(r"^（(.+?)のコメント）(.*)$", stripped)
-        if m:
-            comment_text = m.group(2).strip()
-            if comment_text:
-                return f"{self._indent()}# {comment_text}"
-            return f"{self._indent()}# {m.group(1)}のコメント"
-
-        # --- プログラム開始: 我が名は　尊鷹 / 我が名は 尊鷹 ---
-        if re.match(r"^我が名は[　\s]+尊鷹$", stripped):
-            return f"{self._indent()}import sys"
-
-        # --- プログラム終了: 逃げるんかいっ ---
-        if stripped == "逃げるんかいっ":
-            return f"{self._indent()}sys.exit(0)"
-
-        # --- 変数宣言: Xだ Xが正体を現すぞ ---
-        m = re.match(r"^(.+?)だ\s+\1が正体を現すぞ$", stripped)
-        if m:
-            var_name = m.group(1).strip()
-            return f"{self._indent()}{var_name} = None"
-
-        # --- 代入: (値) を継ぐ (変数) ---
-        m = re.match(r"^(.+?)\s+を継ぐ\s+(.+)$", stripped)
-        if m:
-            value = self._transpile_expr(m.group(1).strip())
-            var_name = m.group(2).strip()
-            return f"{self._indent()}{var_name} = {value}"
-
-        # --- 出力: (値) しゃあっ ---
-        m = re.match(r"^(.+?)\s+しゃあっ$", stripped)
-        if m:
-            value = self._transpile_expr(m.group(1).strip())
-            return f"{self._indent()}print({value})"
-
-        # --- 入力: (変数) を教えてくれよ ---
-        m = re.match(r"^(.+?)\s+を教えてくれよ$", stripped)
-        if m:
-            var_name = m.group(1).strip()
-            return f"{self._indent()}{var_name} = input()"
-
-        # --- インクリメント: (変数) 進化したと言うてくれや ---
-        m = re.match(r"^(.+?)\s+進化したと言うてくれや$", stripped)
-        if m:
-            var_name = m.group(1).strip()
-            return f"{self._indent()}{var_name} += 1"
-
-        # --- デクリメント: (変数) （哀） ---
-        m = re.match(r"^(.+?)\s+（哀）$", stripped)
-        if m:
-            var_name = m.group(1).strip()
-            return f"{self._indent()}{var_name} -= 1"
-
-        # --- 関数定義: 自分たちの手で作るから尊いんだ (関数)が ((引数))るんだ { ---
-        m = re.match(
-            r"^自分たちの手で作るから尊いんだ\s+(.+?)が\s+\((.+?)\)るんだ\s*\{$",
-            stripped,
-        )
-        if m:
-            func_name = m.group(1).strip()
-            args = m.group(2).strip()
-            result = f"{self._indent()}def {func_name}({args}):"
-            self._open_block()
-            return result
-
-        # --- if: なにっ ((条件)) { ---
-        m = re.match(r"^なにっ\s+\((.+?)\)\s*\{$", stripped)
-        if m:
-            condition = self._transpile_expr(m.group(1).strip())
-            result = f"{self._indent()}if {condition}:"
-            self._open_block()
-            return result
-
-        # --- elif: いやちょっとまてよ ((条件)) { ---
-        # } で閉じた直後に来るので、前のブロックは既に閉じている
-        m = re.match(r"^いやちょっとまてよ\s+\((.+?)\)\s*\{$", stripped)
-        if m:
-            condition = self._transpile_expr(m.group(1).strip())
-            result = f"{self._indent()}elif {condition}:"
-            self._open_block()
-            return result
-
-        # --- else: う　あ　あ　あ　あ（ＰＣ書き文字） { ---
-        m = re.match(r"^う[　\s]+あ[　\s]+あ[　\s]+あ[　\s]+あ[（(]\s*[ＰP][ＣC]書き文字\s*[）)]\s*\{$", stripped)
-        if m:
-            result = f"{self._indent()}else:"
-            self._open_block()
-            return result
-
-        # --- while: 禁断の"((条件))度打ち" { ---
-        m = re.match(r'^禁断の[""「](.+?)度打ち[""」]\s*\{$', stripped)
-        if m:
-            condition = self._transpile_expr(m.group(1).strip())
-            result = f"{self._indent()}while {condition}:"
-            self._open_block()
-            return result
+        # --- プログラム開始・終了・例外送出（標準形）: 行全体が決まった文字列 ---
+        exact = _EXACT_LINES.get(stripped)
+        if exact is not None:
+            return self._indent_str + exact
 
-        # --- 例外捕捉: } (変数) はルールで禁止スよね { ---
-        m = re.match(r"^\}\s*(.+?)\s+はルールで禁止スよね\s*\{$", stripped)
-        if m:
-            var_name = m.group(1).strip()
-            self._close_block()
-            result = f"{self._indent()}except Exception as {var_name}:"
-            self._open_block()
-            return result
+        # --- else（標準形）: う　あ　あ　あ　あ（ＰＣ書き文字） { ---
+        if stripped == _ELSE_LINE:
+            return self._emit_else(None)
 
-        # --- 例外送出: はっきり言ってそれって病気だから お前死ぬよ ---
-        if re.match(
-            r"^はっきり言ってそれって病気だから\s+お前死ぬよ$", stripped
-        ):
-            return f"{self._indent()}raise Exception()"
+        # --- 例外捕捉: } (変数) はルールで禁止スよね { ---
+        # } で始まり「を継ぐ」を含まない行で、例外捕捉より優先される規則はない
+        if stripped[0] == "}" and "を継ぐ" not in stripped:
+            m = _CATCH_RE.match(stripped)
+            if m:
+                return self._emit_catch(m)
+
+        # 先頭・末尾のキーワードで候補を絞り、該当する規則の正規表現だけを試す
+        for test, keyword, pattern, handler in self._LINE_RULES:
+            if not test(stripped, keyword):
+                continue
+            m = pattern.match(stripped)
+            if m:
+                return handler(self, m)
 
         # --- 認識できない行 ---
         raise ToughTranspileError(f"認識できない構文: {stripped}", line_number)
 
+    # --- コメント: （○○のコメント）コメント内容 ---
+    # （○○のコメント）が Python の # に相当。○○は何でも良い。
+    def _emit_comment(self, m: re.Match) -> str:
+        comment_text = m.group(2).strip()
+        if comment_text:
+            return f"{self._indent_str}# {comment_text}"
+        return f"{self._indent_str}# {m.group(1)}のコメント"
+
+    # --- プログラム開始: 我が名は　尊鷹 / 我が名は 尊鷹 ---
+    def _emit_program_start(self, m: re.Match) -> str:
+        return f"{self._indent_str}import sys"
+
+    # --- 変数宣言: Xだ Xが正体を現すぞ ---
+    def _emit_declare(self, m: re.Match) -> str:
+        var_name = m.group(1).strip()
+        return f"{self._indent_str}{var_name} = None"
+
+    # --- 代入: (値) を継ぐ (変数) ---
+    def _emit_assign(self, m: re.Match) -> str:
+        value = self._transpile_expr(m.group(1).strip())
+        var_name = m.group(2).strip()
+        return f"{self._indent_str}{var_name} = {value}"
+
+    # --- 出力: (値) しゃあっ ---
+    def _emit_print(self, m: re.Match) -> str:
+        value = self._transpile_expr(m.group(1).strip())
+        return f"{self._indent_str}print({value})"
+
+    # --- 入力: (変数) を教えてくれよ ---
+    def _emit_input(self, m: re.Match) -> str:
+        var_name = m.group(1).strip()
+        return f"{self._indent_str}{var_name} = input()"
+
+    # --- インクリメント: (変数) 進化したと言うてくれや ---
+    def _emit_increment(self, m: re.Match) -> str:
+        var_name = m.group(1).strip()
+        return f"{self._indent_str}{var_name} += 1"
+
+    # --- デクリメント: (変数) （哀） ---
+    def _emit_decrement(self, m: re.Match) -> str:
+        var_name = m.group(1).strip()
+        return f"{self._indent_str}{var_name} -= 1"
+
+    # --- 関数定義: 自分たちの手で作るから尊いんだ (関数)が ((引数))るんだ { ---
+    def _emit_fn(self, m: re.Match) -> str:
+        func_name = m.group(1).strip()
+        args = m.group(2).strip()
+        result = f"{self._indent_str}def {func_name}({args}):"
+        self._open_block()
+        return result
+
+    # --- if: なにっ ((条件)) { ---
+    def _emit_if(self, m: re.Match) -> str:
+        condition = self._transpile_expr(m.group(1).strip())
+        result = f"{self._indent_str}if {condition}:"
+        self._open_block()
+        return result
+
+    # --- elif: いやちょっとまてよ ((条件)) { ---
+    # } で閉じた直後に来るので、前のブロックは既に閉じている
+    def _emit_elif(self, m: re.Match) -> str:
+        condition = self._transpile_expr(m.group(1).strip())
+        result = f"{self._indent_str}elif {condition}:"
+        self._open_block()
+        return result
+
+    # --- else: う　あ　あ　あ　あ（ＰＣ書き文字） { ---
+    def _emit_else(self, m: re.Match | None) -> str:
+        result = f"{self._indent_str}else:"
+        self._open_block()
+        return result
+
+    # --- while: 禁断の"((条件))度打ち" { ---
+    def _emit_while(self, m: re.Match) -> str:
+        condition = self._transpile_expr(m.group(1).strip())
+        result = f"{self._indent_str}while {condition}:"
+        self._open_block()
+        return result
+
+    # --- 例外捕捉: } (変数) はルールで禁止スよね { ---
+    def _emit_catch(self, m: re.Match) -> str:
+        var_name = m.group(1).strip()
+        self._close_block()
+        result = f"{self._indent_str}except Exception as {var_name}:"
+        self._open_block()
+        return result
+
+    # --- 例外送出: はっきり言ってそれって病気だから お前死ぬよ ---
+    def _emit_throw(self, m: re.Match) -> str:
+        return f"{self._indent_str}raise Exception()"
+
+    # 行の規則（優先度順）: (判定関数, キーワード, 正規表現, 変換メソッド)
+    # 判定関数が偽の行はその正規表現に決してマッチしないので、試さずに飛ばす
+    _LINE_RULES = [
+        (str.startswith, "（", _COMMENT_RE, _emit_comment),
+        (str.startswith, "我が名は", _PROGRAM_START_RE, _emit_program_start),
+        (str.endswith, "が正体を現すぞ", _DECLARE_RE, _emit_declare),
+        (str.__contains__, "を継ぐ", _ASSIGN_RE, _emit_assign),
+        (str.endswith, "しゃあっ", _PRINT_RE, _emit_print),
+        (str.endswith, "を教えてくれよ", _INPUT_RE, _emit_input),
+        (str.endswith, "進化したと言うてくれや", _INCREMENT_RE, _emit_increment),
+        (str.endswith, "（哀）", _DECREMENT_RE, _emit_decrement),
+        (str.startswith, "自分たちの手で作るから尊いんだ", _FN_RE, _emit_fn),
+        (str.startswith, "なにっ", _IF_RE, _emit_if),
+        (str.startswith, "いやちょっとまてよ", _ELIF_RE, _emit_elif),
+        (str.startswith, "う", _ELSE_RE, _emit_else),
+        (str.startswith, "禁断の", _WHILE_RE, _emit_while),
+        (str.startswith, "}", _CATCH_RE, _emit_catch),
+        (str.startswith, "はっきり言って", _THROW_RE, _emit_throw),
+    ]
+
     def _transpile_expr(self, expr: str) -> str:
-        """式中のTOUGH演算子をPython演算子に変換する"""
-        # 比較演算子（長いパターンを先にマッチ）
-        expr = expr.replace("ガチンコじゃない", " != ")
-        expr = expr.replace("ガチンコ", " == ")
-        expr = expr.replace("を超えた", " > ")
-        expr = expr.replace("に及ばない", " < ")
+        """式中のTOUGH演算子をPython演算子に変換する（expr は前後の空白を除いたもの）"""
+        # 演算子の先頭文字（ガ・を・に）を含むか
+        has_op = "ガ" in expr or "を" in expr or "に" in expr
+
+        # 識別子・整数だけの式（よくある形）は変換するものがないのでそのまま返す
+        if not has_op and (expr.isidentifier() or expr.isdecimal()):
+            return expr
 
+        # 比較演算子（1 回の走査でまとめて置換）
+        if has_op:
+            expr = _OP_RE.sub(_replace_op, expr)
 
         # 文字列リテラル: 「...」 → "..."
-        expr = re.sub(r"「(.+?)」", r'"\1"', expr)
+        if "「" in expr:
+            expr = _STRING_RE.sub(r'"\1"', expr)
 
-        # 余分な空白を整理
-        expr = re.sub(r"\s+", " ", expr).strip()
+        # 余分な空白を整理（演算子まわりは置換で整っているので、残っている場合だけ）
+        if _IRREGULAR_WS_RE.search(expr):
+            expr = _WS_RE.sub(" ", expr)
 
-        return expr
+        return expr.strip()
 
     def transpile(self, source: str) -> str:
         """TOUGH ソースコード全体を Python コードに変換する
@@ -200,27 +290,66 @@ class ToughTranspiler:
         """
         self._indent_level = 0
         self._indent_stack.clear()
+        self._indent_str = ""
         lines = source.splitlines()
         python_lines: list[str] = []
 
-        for i, line in enumerate(lines, start=1):
-            try:
+        # try はファイル全体で 1 つにし、失敗した行番号はループ変数から取る
+        i = 0
+        try:
+            for i, line in enumerate(lines, start=1):
                 result = self._transpile_line(line, i)
                 if result is not None:
                     python_lines.append(result)
-            except ToughTranspileError:
-                raise
-            except Exception as e:
-                raise ToughTranspileError(str(e), i) from e
+        except ToughTranspileError:
+            raise
+        except Exception as e:
+            raise ToughTranspileError(str(e), i) from e
 
         return "\n".join(python_lines)
 
 
+# ソースのハッシュ → (変換後の Python コード, コンパイル済みコードオブジェクト) のキャッシュ
+# REPL などで実行し続けても増え続けないよう、最近使った分だけ残す
+_PYTHON_CACHE_SIZE = 128
+_PYTHON_CACHE = BoundedCache(_PYTHON_CACHE_SIZE)
+
+
+def _transpile_cached(source: str) -> tuple[str, CodeType]:
+    """ソースコードを Python コードに変換してコンパイルする（同じソースは結果を使い回す）"""
+    key = hash_source(source)
+    cached = _PYTHON_CACHE.get(key)
+    if cached is None:
+        python_code = ToughTranspiler().transpile(source)
+        code = compile(python_code, f"<tough:{key.hex()}>", "exec")
+        cached = python_code, code
+        _PYTHON_CACHE[key] = cached
+    return cached
+
+
+# 生成コードを実行するグローバル名前空間の雛形（実行ごとにコピーして使う）
+_BASE_GLOBALS = {"__builtins__": __builtins__, "sys": sys}
+
+
 def run_tough(source: str) -> None:
     """TOUGH ソースコードをトランスパイルして実行する"""
-    transpiler = ToughTranspiler()
-    python_code = transpiler.transpile(source)
-    exec(python_code, {"__builtins__": __builtins__, "sys": sys})
+    _, code = _transpile_cached(source)
+    exec(code, dict(_BASE_GLOBALS))
+
+
+class ToughRunner:
+    """同じ名前空間で TOUGH プログラムを続けて実行するランナー
+
+    変数は実行をまたいで残る（REPL のように少しずつ実行する用途向け）。
+    """
+
+    def __init__(self):
+        self.globals = dict(_BASE_GLOBALS)
+
+    def run(self, source: str) -> None:
+        """TOUGH ソースコードをトランスパイルして、この名前空間で実行する"""
+        _, code = _transpile_cached(source)
+        exec(code, self.globals)
 
 
 def run_tough_file(filepath: str) -> None: